@@ -0,0 +1,86 @@
+import heapq
+import time
+from abc import ABC, abstractmethod
+from typing import Callable
+
+from .models import AllocationResult, AppointmentRequest, Veterinarian, allocate_many
+
+
+class AllocationStrategy(ABC):
+    @abstractmethod
+    def allocate(self, requests: list[AppointmentRequest], veterinarians: list[Veterinarian]) -> AllocationResult:
+        raise NotImplementedError
+
+
+class GreedyStrategy(AllocationStrategy):
+    """Comportamiento por defecto: el de `allocate_appointment` solicitud a solicitud."""
+
+    def allocate(self, requests: list[AppointmentRequest], veterinarians: list[Veterinarian]) -> AllocationResult:
+        return allocate_many(requests, veterinarians)
+
+
+class BalancedStrategy(AllocationStrategy):
+    """Resuelve el lote completo: máximo de citas asignadas y carga relativa equilibrada.
+
+    Cada veterinario tiene una sola especialidad y la capacidad es por día, así que el grafo de flujo
+    solicitudes × veterinarios × fechas se separa en grupos (especialidad, fecha) independientes. En
+    cada grupo el flujo máximo es min(solicitudes, capacidad libre), y repartir las plazas de una en
+    una al veterinario con menor ocupación resultante (carga / máximo diario) da el reparto de coste
+    mínimo. Si se agota `time_budget` (segundos), los grupos pendientes se asignan con `fallback`.
+    """
+
+    def __init__(
+        self,
+        time_budget: float | None = None,
+        fallback: AllocationStrategy | None = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        self.time_budget = time_budget
+        self.fallback = fallback or GreedyStrategy()
+        self.clock = clock
+
+    def allocate(self, requests: list[AppointmentRequest], veterinarians: list[Veterinarian]) -> AllocationResult:
+        deadline = None if self.time_budget is None else self.clock() + self.time_budget
+        by_specialty: dict[str, list[tuple[int, Veterinarian]]] = {}
+        for position, vet in enumerate(veterinarians):
+            by_specialty.setdefault(vet.specialty, []).append((position, vet))
+        groups: dict[tuple[str, object], list[AppointmentRequest]] = {}
+        for request in requests:
+            groups.setdefault((request.specialty, request.date), []).append(request)
+
+        result = AllocationResult()
+        pending: list[AppointmentRequest] = []
+        for (specialty, date), group in groups.items():
+            if deadline is not None and self.clock() > deadline:
+                pending.extend(group)
+                continue
+            self._allocate_group(group, date, by_specialty.get(specialty, ()), result)
+
+        if pending:
+            fallback = self.fallback.allocate(pending, veterinarians)
+            result.assignments.update(fallback.assignments)
+            result.unallocated.extend(fallback.unallocated)
+        # Mismo orden que las solicitudes de entrada
+        order = {request.id: index for index, request in enumerate(requests)}
+        result.assignments = dict(sorted(result.assignments.items(), key=lambda item: order[item[0]]))
+        result.unallocated.sort(key=lambda request: order[request.id])
+        return result
+
+    @staticmethod
+    def _allocate_group(group, date, vets, result: AllocationResult):
+        heap = []
+        for position, vet in vets:
+            load = vet.load_on(date)
+            if load < vet.max_daily_appointments:
+                heap.append(((load + 1) / vet.max_daily_appointments, position, load, vet))
+        heapq.heapify(heap)
+        for index, request in enumerate(group):
+            if not heap:
+                result.unallocated.extend(group[index:])
+                return
+            _, position, load, vet = heapq.heappop(heap)
+            vet.assign_appointment(request)
+            result.assignments[request.id] = vet.id
+            load += 1
+            if load < vet.max_daily_appointments:
+                heapq.heappush(heap, ((load + 1) / vet.max_daily_appointments, position, load, vet))
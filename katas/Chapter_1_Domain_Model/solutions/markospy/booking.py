@@ -0,0 +1,35 @@
+import asyncio
+from typing import Awaitable, Callable
+
+from .models import AppointmentRequest, Veterinarian, allocate_appointment
+
+OnBooked = Callable[[Veterinarian, AppointmentRequest], Awaitable[None]]
+
+
+class AsyncBookingService:
+    """Servicio de reservas para muchos clientes concurrentes sobre asyncio.
+
+    La plaza se reserva con `allocate_appointment`, que no cede el event loop entre comprobar y
+    asignar, así que dos corrutinas nunca sobrepasan `max_daily_appointments`. La E/S (`on_booked`,
+    p. ej. guardar en un repositorio asíncrono) se espera después; si falla, la cita se cancela.
+    """
+
+    def __init__(self, veterinarians: list[Veterinarian], on_booked: OnBooked | None = None):
+        self.veterinarians = veterinarians
+        self._on_booked = on_booked
+        self._by_id = {vet.id: vet for vet in veterinarians}
+
+    async def book(self, appointment: AppointmentRequest):
+        vet_id = allocate_appointment(appointment, self.veterinarians)
+        if self._on_booked is not None:
+            vet = self._by_id[vet_id]
+            try:
+                await self._on_booked(vet, appointment)
+            except BaseException:
+                vet.cancel_appointment(appointment)
+                raise
+        return vet_id
+
+    async def book_many(self, appointments: list[AppointmentRequest]) -> list:
+        """Reserva en paralelo; cada posición contiene el id del veterinario o la excepción recibida."""
+        return await asyncio.gather(*(self.book(appointment) for appointment in appointments), return_exceptions=True)
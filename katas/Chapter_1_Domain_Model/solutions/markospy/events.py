@@ -0,0 +1,31 @@
+from dataclasses import dataclass
+from uuid import UUID
+
+
+class Event:
+    __slots__ = ()
+
+
+@dataclass(frozen=True, slots=True)
+class AppointmentAllocated(Event):
+    vet_id: UUID
+    appointment_id: UUID | int
+    specialty: str
+    date: object
+
+
+@dataclass(frozen=True, slots=True)
+class AppointmentCancelled(Event):
+    vet_id: UUID
+    appointment_id: UUID | int
+    specialty: str
+    date: object
+
+
+@dataclass(frozen=True, slots=True)
+class VisitRecorded(Event):
+    """Lo publica la aplicación al cerrar una consulta; el modelo de este capítulo no registra visitas."""
+
+    vet_id: UUID
+    pet_name: str
+    date: object
@@ -0,0 +1,125 @@
+"""Importación en streaming de solicitudes de cita desde exportaciones CSV/JSONL del sistema anterior.
+
+Tubería de generadores: leer -> parsear/validar -> agrupar en lotes -> `allocate_many`. Solo hay en
+memoria un lote (y, con `workers`, una ventana acotada de trozos en los procesos), así que el
+tamaño del fichero no importa.
+"""
+
+import csv
+import datetime
+import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from .models import AppointmentRequest, Veterinarian, allocate_many
+
+REQUIRED = ("client_name", "pet_name", "specialty", "date")
+
+
+@dataclass
+class ImportReport:
+    """`rejected` guarda solo las primeras filas rechazadas como ejemplo; `rejected_count` las cuenta todas."""
+
+    read: int = 0
+    allocated: int = 0
+    unallocated: int = 0
+    rejected_count: int = 0
+    rejected: list[tuple[int, str]] = field(default_factory=list)  # (nº de línea, motivo)
+
+    def reject(self, number: int, reason: str, keep: int):
+        self.rejected_count += 1
+        if len(self.rejected) < keep:
+            self.rejected.append((number, reason))
+
+
+def read_records(path: str | Path) -> Iterator[tuple[int, dict]]:
+    """Devuelve (nº de línea, registro) de un .csv con cabecera o de un .jsonl."""
+    path = Path(path)
+    with open(path, newline="", encoding="utf-8") as file:
+        if path.suffix == ".jsonl":
+            for number, line in enumerate(file, 1):
+                if line.strip():
+                    try:
+                        yield number, json.loads(line)
+                    except json.JSONDecodeError as error:
+                        yield number, {"_error": f"JSON inválido: {error.msg}"}
+        else:
+            # La línea 1 es la cabecera
+            for number, row in enumerate(csv.DictReader(file), 2):
+                yield number, row
+
+
+def parse_record(record: dict) -> tuple | str:
+    """Devuelve los argumentos de AppointmentRequest o el motivo del rechazo."""
+    if not isinstance(record, dict):
+        return f"No es un objeto: {type(record).__name__}"
+    if "_error" in record:
+        return record["_error"]
+    values = {name: str(record.get(name) or "").strip() for name in REQUIRED}
+    missing = [name for name in REQUIRED if not values[name]]
+    if missing:
+        return f"Faltan campos: {', '.join(missing)}"
+    try:
+        date = datetime.date.fromisoformat(values["date"])
+    except ValueError:
+        return f"Fecha inválida: {record['date']!r}"
+    return (values["client_name"], values["pet_name"], values["specialty"], date)
+
+
+def parse_chunk(chunk: list[tuple[int, dict]]) -> list[tuple[int, tuple | str]]:
+    return [(number, parse_record(record)) for number, record in chunk]
+
+
+def chunks(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def parse_stream(records: Iterable[tuple[int, dict]], workers: int = 0, chunk_size: int = 1_000):
+    """Parsea en este proceso o, con `workers`, en un pool de procesos con una ventana acotada de trozos."""
+    if not workers:
+        for number, record in records:
+            yield number, parse_record(record)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        window = deque()
+        for chunk in chunks(records, chunk_size):
+            window.append(executor.submit(parse_chunk, chunk))
+            if len(window) >= 2 * workers:
+                yield from window.popleft().result()
+        while window:
+            yield from window.popleft().result()
+
+
+def import_appointments(
+    path: str | Path,
+    veterinarians: list[Veterinarian],
+    batch_size: int = 10_000,
+    workers: int = 0,
+    max_rejected: int = 1_000,
+    on_rejected: Callable[[int, str], None] | None = None,
+) -> ImportReport:
+    """Cada fila rechazada se pasa a `on_rejected` (p. ej. para volcarlas a un fichero); el informe guarda
+    como mucho `max_rejected`, así la memoria no crece con el tamaño de la exportación."""
+    report = ImportReport()
+
+    def valid_requests():
+        for number, parsed in parse_stream(read_records(path), workers):
+            report.read += 1
+            if isinstance(parsed, str):
+                report.reject(number, parsed, max_rejected)
+                if on_rejected is not None:
+                    on_rejected(number, parsed)
+            else:
+                yield AppointmentRequest(*parsed)
+
+    for batch in chunks(valid_requests(), batch_size):
+        result = allocate_many(batch, veterinarians)
+        report.allocated += len(result.assignments)
+        report.unallocated += len(result.unallocated)
+    return report
@@ -0,0 +1,259 @@
+"""Instrumentación de las rutas calientes: número de llamadas, histogramas de latencia y fallos de asignación.
+
+Coste cero mientras está desactivada: `enable()` sustituye las funciones y métodos elegidos por
+envoltorios que miden, y `disable()` restaura los originales. Sirve también para clases de otras
+katas, p. ej. `instrumentation.instrument(SqlitePetRepository, "add", "get", "list")`.
+"""
+
+import bisect
+import cProfile
+import functools
+import io
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from . import booking, models
+from .exceptions import NoAvailableVet
+
+# Límites superiores (segundos) de los buckets del histograma, como en Prometheus
+BUCKETS = (1e-6, 5e-6, 1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5, 1.0, float("inf"))
+
+# Original sin envolver, para reconocer la asignación y contar sus fallos por especialidad
+_ALLOCATE = models.allocate_appointment
+
+
+@dataclass
+class OperationMetrics:
+    calls: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    buckets: list[int] = field(default_factory=lambda: [0] * len(BUCKETS))
+
+    def observe(self, seconds: float, failed: bool):
+        self.calls += 1
+        self.errors += failed
+        self.total_seconds += seconds
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+
+
+@dataclass
+class Capture:
+    profile: pstats.Stats | None = None
+    memory_top: list[tracemalloc.Statistic] = field(default_factory=list)
+
+
+def _label(value: str) -> str:
+    """Escapa un valor de etiqueta de Prometheus."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Instrumentation:
+    def __init__(self, prefix: str = "vet"):
+        self.prefix = prefix
+        self.enabled = False
+        self.operations: dict[str, OperationMetrics] = {}
+        self.allocation_requests: dict[str, int] = {}  # especialidad -> solicitudes
+        self.allocation_failures: dict[str, int] = {}  # especialidad -> NoAvailableVet
+        self._targets: list[tuple[object, str, str]] = []  # (dueño, atributo, nombre de la operación)
+        self._originals: dict[tuple[int, str], tuple[object, bool]] = {}  # -> (original, definido en el dueño)
+        self._lock = threading.Lock()
+
+    def instrument(self, owner: object, *names: str):
+        """Registra funciones de un módulo o métodos de una clase para medirlos mientras esté activa."""
+        for name in names:
+            if any(target is owner and target_name == name for target, target_name, _ in self._targets):
+                continue
+            operation = f"{getattr(owner, '__name__', type(owner).__name__)}.{name}"
+            self._targets.append((owner, name, operation))
+            if self.enabled:
+                self._patch(owner, name, operation)
+
+    def enable(self):
+        if self.enabled:
+            return
+        patched = []
+        try:
+            for target in self._targets:
+                self._patch(*target)
+                patched.append(target)
+        except Exception:
+            for owner, name, _ in patched:
+                self._restore(owner, name)
+            raise
+        self.enabled = True
+
+    def disable(self):
+        if self.enabled:
+            self.enabled = False
+            for owner, name, _ in self._targets:
+                self._restore(owner, name)
+
+    def _restore(self, owner: object, name: str):
+        original, owned = self._originals.pop((id(owner), name))
+        # Si otro código sustituyó el atributo después, no se pisa su cambio
+        if getattr(getattr(owner, name, None), "__instrumentation__", None) is not self:
+            return
+        if owned:
+            setattr(owner, name, original)
+        else:
+            delattr(owner, name)  # era heredado: se vuelve a ver el de la clase base
+
+    def _patch(self, owner: object, name: str, operation: str):
+        original = getattr(owner, name)
+        if hasattr(original, "__instrumentation__"):
+            raise RuntimeError(f"{operation} ya está instrumentado por otra instancia de Instrumentation")
+        self._originals[(id(owner), name)] = (original, name in vars(owner))
+        metrics = self.operations.setdefault(operation, OperationMetrics())
+        is_allocation = original is _ALLOCATE
+
+        @functools.wraps(original)
+        def wrapper(*args, **kwargs):
+            failed = unavailable = False
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            except Exception as error:
+                failed = True
+                unavailable = isinstance(error, NoAvailableVet)
+                raise
+            finally:
+                # Un fallo al registrar métricas nunca sustituye al resultado ni a la excepción original
+                try:
+                    self._record(metrics, time.perf_counter() - start, failed, is_allocation, unavailable, args, kwargs)
+                except Exception:
+                    pass
+
+        wrapper.__instrumentation__ = self
+        setattr(owner, name, wrapper)
+
+    def _record(self, metrics: OperationMetrics, elapsed: float, failed: bool, is_allocation: bool,
+                unavailable: bool, args: tuple, kwargs: dict):
+        with self._lock:
+            metrics.observe(elapsed, failed)
+        if not is_allocation:
+            return
+        # La solicitud puede llegar por posición o por nombre
+        appointment = kwargs.get("appointment", args[0] if args else None)
+        specialty = getattr(appointment, "specialty", None)
+        if specialty is None:
+            return
+        self._count(self.allocation_requests, specialty)
+        if unavailable:
+            self._count(self.allocation_failures, specialty)
+
+    def _count(self, counter: dict[str, int], key: str):
+        with self._lock:
+            counter[key] = counter.get(key, 0) + 1
+
+    def measure(self, operation: str):
+        """Context manager para medir un bloque; si está desactivada no mide nada."""
+        if not self.enabled:
+            return nullcontext()
+        return self._measure(self.operations.setdefault(operation, OperationMetrics()))
+
+    @contextmanager
+    def _measure(self, metrics: OperationMetrics):
+        failed = False
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                metrics.observe(elapsed, failed)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "operations": {
+                    name: {
+                        "calls": metrics.calls,
+                        "errors": metrics.errors,
+                        "total_seconds": metrics.total_seconds,
+                        "buckets": dict(zip(BUCKETS, metrics.buckets)),
+                    }
+                    for name, metrics in self.operations.items()
+                },
+                "allocation": {
+                    specialty: {
+                        "requests": requests,
+                        "failures": self.allocation_failures.get(specialty, 0),
+                        "failure_rate": self.allocation_failures.get(specialty, 0) / requests,
+                    }
+                    for specialty, requests in self.allocation_requests.items()
+                },
+            }
+
+    def prometheus(self) -> str:
+        """Formato de texto de Prometheus."""
+        p = self.prefix
+        snapshot = self.snapshot()
+        snapshot = {
+            section: {_label(key): value for key, value in values.items()} for section, values in snapshot.items()
+        }
+        lines = [f"# TYPE {p}_calls_total counter"]
+        lines += [f'{p}_calls_total{{operation="{name}"}} {m["calls"]}' for name, m in snapshot["operations"].items()]
+        lines.append(f"# TYPE {p}_errors_total counter")
+        lines += [f'{p}_errors_total{{operation="{name}"}} {m["errors"]}' for name, m in snapshot["operations"].items()]
+        lines.append(f"# TYPE {p}_latency_seconds histogram")
+        for name, metrics in snapshot["operations"].items():
+            cumulative = 0
+            for bound, count in metrics["buckets"].items():
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{p}_latency_seconds_bucket{{operation="{name}",le="{le}"}} {cumulative}')
+            lines.append(f'{p}_latency_seconds_sum{{operation="{name}"}} {metrics["total_seconds"]}')
+            lines.append(f'{p}_latency_seconds_count{{operation="{name}"}} {metrics["calls"]}')
+        lines.append(f"# TYPE {p}_allocation_requests_total counter")
+        lines += [
+            f'{p}_allocation_requests_total{{specialty="{specialty}"}} {m["requests"]}'
+            for specialty, m in snapshot["allocation"].items()
+        ]
+        lines.append(f"# TYPE {p}_allocation_failures_total counter")
+        lines += [
+            f'{p}_allocation_failures_total{{specialty="{specialty}"}} {m["failures"]}'
+            for specialty, m in snapshot["allocation"].items()
+        ]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str | Path):
+        # Se escribe a un temporal y se renombra para que el recolector nunca lea un fichero a medias
+        path = Path(path)
+        temporary = path.with_suffix(path.suffix + ".tmp")
+        temporary.write_text(self.prometheus(), encoding="utf-8")
+        temporary.replace(path)
+
+    @contextmanager
+    def capture(self, profile: bool = True, memory: bool = False, top: int = 20):
+        """Modo diagnóstico: cProfile y/o tracemalloc durante el bloque. Los resultados quedan en el Capture."""
+        result = Capture()
+        profiler = cProfile.Profile() if profile else None
+        if memory:
+            tracemalloc.start()
+        if profiler:
+            profiler.enable()
+        try:
+            yield result
+        finally:
+            if profiler:
+                profiler.disable()
+                result.profile = pstats.Stats(profiler, stream=io.StringIO()).sort_stats("cumulative")
+            if memory:
+                result.memory_top = tracemalloc.take_snapshot().statistics("lineno")[:top]
+                tracemalloc.stop()
+
+
+def instrument_allocation(instrumentation: Instrumentation):
+    """Registra las rutas calientes del dominio: la asignación y el alta de citas en el veterinario."""
+    instrumentation.instrument(models, "allocate_appointment")
+    # booking importó la función por nombre, así que también se sustituye allí
+    instrumentation.instrument(booking, "allocate_appointment")
+    instrumentation.instrument(models.Veterinarian, "assign_appointment", "cancel_appointment")
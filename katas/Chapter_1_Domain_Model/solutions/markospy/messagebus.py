@@ -0,0 +1,114 @@
+import logging
+import time
+from collections import deque
+from concurrent.futures import Executor, wait
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+from .events import Event
+from .models import Veterinarian
+
+logger = logging.getLogger(__name__)
+
+# Un handler recibe el evento y puede devolver nuevos eventos, que se encolan en el mismo bus
+Handler = Callable[[Event], Iterable[Event] | None]
+
+
+@dataclass(slots=True)
+class HandlerStats:
+    calls: int = 0
+    errors: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+
+    @property
+    def mean_seconds(self) -> float:
+        return self.total_seconds / self.calls if self.calls else 0.0
+
+
+class MessageBus:
+    """Bus de eventos en proceso.
+
+    Los handlers de cada tipo se resuelven una sola vez (incluidos los registrados para clases base) y
+    se guardan como tuplas, así que despachar un evento es una búsqueda en un dict sin copiar listas.
+    Los handlers marcados como `threaded` se envían al `executor` y el lote espera a que terminen.
+    """
+
+    def __init__(self, executor: Executor | None = None, timed: bool = True):
+        self._subscriptions: dict[type, list[tuple[Handler, bool]]] = {}
+        self._table: dict[type, tuple[tuple[Handler, bool], ...]] = {}
+        self._queue: deque[Event] = deque()
+        self._executor = executor
+        self._timed = timed
+        self.stats: dict[Handler, HandlerStats] = {}
+
+    def subscribe(self, event_type: type, handler: Handler, threaded: bool = False):
+        if threaded and self._executor is None:
+            raise ValueError("Un handler threaded necesita un executor")
+        self._subscriptions.setdefault(event_type, []).append((handler, threaded))
+        self.stats.setdefault(handler, HandlerStats())
+        self._table.clear()
+
+    def _handlers_for(self, event_type: type) -> tuple[tuple[Handler, bool], ...]:
+        handlers = self._table.get(event_type)
+        if handlers is None:
+            handlers = self._table[event_type] = tuple(
+                subscription for cls in event_type.__mro__ for subscription in self._subscriptions.get(cls, ())
+            )
+        return handlers
+
+    def publish(self, event: Event):
+        self._queue.append(event)
+
+    def publish_many(self, events: Iterable[Event]):
+        self._queue.extend(events)
+
+    def collect(self, veterinarians: Iterable[Veterinarian]):
+        """Encola los eventos pendientes de los agregados y los vacía."""
+        for vet in veterinarians:
+            if vet.events:
+                self._queue.extend(vet.events)
+                vet.events.clear()
+
+    def handle(self, event: Event):
+        self.publish(event)
+        self.run_pending()
+
+    def run_pending(self) -> int:
+        """Despacha la cola completa, incluidos los eventos que emitan los handlers. Devuelve cuántos procesó."""
+        processed = 0
+        while self._queue:
+            futures = []
+            batch, self._queue = self._queue, deque()
+            for event in batch:
+                for handler, threaded in self._handlers_for(type(event)):
+                    if threaded:
+                        futures.append((handler, self._executor.submit(self._run, handler, event)))
+                    else:
+                        self._record(handler, *self._run(handler, event))
+                processed += 1
+            if futures:
+                wait([future for _, future in futures])
+                # Las estadísticas se actualizan desde este hilo para no necesitar locks
+                for handler, future in futures:
+                    self._record(handler, *future.result())
+        return processed
+
+    def _run(self, handler: Handler, event: Event) -> tuple[Iterable[Event] | None, float, bool]:
+        start = time.perf_counter() if self._timed else 0.0
+        try:
+            new_events, failed = handler(event), False
+        except Exception:
+            logger.exception("Error manejando %s con %s", event, handler)
+            new_events, failed = None, True
+        return new_events, time.perf_counter() - start if self._timed else 0.0, failed
+
+    def _record(self, handler: Handler, new_events: Iterable[Event] | None, elapsed: float, failed: bool):
+        stats = self.stats[handler]
+        stats.calls += 1
+        stats.errors += failed
+        stats.total_seconds += elapsed
+        if elapsed > stats.max_seconds:
+            stats.max_seconds = elapsed
+        if new_events:
+            self._queue.extend(new_events)
@@ -1,50 +1,190 @@
-from uuid import uuid4
+import heapq
+import threading
+from dataclasses import dataclass, field
+from uuid import UUID, uuid4
 
+from .events import AppointmentAllocated, AppointmentCancelled, Event
 from .exceptions import NoAvailableVet
 
 
+@dataclass(frozen=True, slots=True)
 class AppointmentRequest:
-    def __init__(self, client_name: str, pet_name: str, specialty: str, date):
-        self.id = uuid4()
-        self.client_name = client_name
-        self.pet_name = pet_name
-        self.specialty = specialty
-        self.date = date
+    """Objeto de valor inmutable. Acepta un `id` propio (p. ej. un entero de `itertools.count`) para
+    evitar el coste de `uuid4()` al cargar históricos grandes."""
+
+    client_name: str
+    pet_name: str
+    specialty: str
+    date: object
+    id: UUID | int = field(default_factory=uuid4)
+
+    def __hash__(self):
+        # Dos solicitudes iguales comparten id, así que basta con él para el hash
+        return hash(self.id)
 
 
 class Veterinarian:
-    def __init__(self, name: str, specialty: str, max_daily_appointments: int):
+    def __init__(self, name: str, specialty: str, max_daily_appointments: int, record_events: bool = False):
         self.id = uuid4()
         self.name = name
         self.specialty = specialty
         self.max_daily_appointments = max_daily_appointments
         self._appointments: set[AppointmentRequest] = set()
+        # Índice por día: la capacidad se controla por fecha, no para todo el calendario
+        self._appointments_by_date: dict[object, set[AppointmentRequest]] = {}
+        # Hace atómico el "comprobar y asignar" cuando varios hilos reservan con el mismo veterinario
+        self._lock = threading.Lock()
+        # Los eventos solo se acumulan si se piden (p. ej. para un MessageBus que los recoja con `collect`);
+        # las rutas por lotes no los recogen y crecerían con cada asignación
+        self.record_events = record_events
+        self.events: list[Event] = []
+
+    def __getstate__(self):
+        # El lock no se puede serializar; hace falta para enviar veterinarios a otros procesos
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def load_on(self, date) -> int:
+        appointments = self._appointments_by_date.get(date)
+        return len(appointments) if appointments else 0
 
     def can_accept_appointment(self, appointment_request: AppointmentRequest) -> bool:
         return (
-            len(self._appointments) < self.max_daily_appointments and appointment_request.specialty == self.specialty
+            appointment_request.specialty == self.specialty
+            and self.load_on(appointment_request.date) < self.max_daily_appointments
         )
 
     def assign_appointment(self, appointment_request: AppointmentRequest):
-        if not self.can_accept_appointment(appointment_request):
-            return False
-        self._appointments.add(appointment_request)
-        return True
+        with self._lock:
+            if not self.can_accept_appointment(appointment_request):
+                return False
+            self._appointments.add(appointment_request)
+            self._appointments_by_date.setdefault(appointment_request.date, set()).add(appointment_request)
+            if self.record_events:
+                self.events.append(
+                    AppointmentAllocated(self.id, appointment_request.id, self.specialty, appointment_request.date)
+                )
+            return True
 
     def cancel_appointment(self, appointment_request: AppointmentRequest):
-        self._appointments.remove(appointment_request)
+        with self._lock:
+            self._appointments.remove(appointment_request)
+            day = self._appointments_by_date[appointment_request.date]
+            day.remove(appointment_request)
+            if not day:
+                del self._appointments_by_date[appointment_request.date]
+            if self.record_events:
+                self.events.append(
+                    AppointmentCancelled(self.id, appointment_request.id, self.specialty, appointment_request.date)
+                )
 
 
 # Servicio de Dominio: lógica de negocio que reside en el dominio pero que no encaja de forma natural en una entidad o un objeto de valor (como un calculador de impuestos).
 def allocate_appointment(appointment: AppointmentRequest, veterinarians: list[Veterinarian]):
-    sorted_vets = sorted(
-        veterinarians,
-        key=lambda vet: (
-            vet.max_daily_appointments <= len(vet._appointments),  # False primero (pueden aceptar)
-            len(vet._appointments),  # Luego por número de citas
-        ),
-    )
-    for vet in sorted_vets:
+    # Equivale a ordenar por (lleno, nº de citas del día) y tomar el primero que acepte, pero en O(V)
+    while True:
+        candidates = (vet for vet in veterinarians if vet.can_accept_appointment(appointment))
+        vet = min(candidates, key=lambda vet: vet.load_on(appointment.date), default=None)
+        if vet is None:
+            raise NoAvailableVet()
+        # Si otro hilo llenó al veterinario entre la elección y la asignación, se vuelve a elegir
         if vet.assign_appointment(appointment):
             return vet.id
-    raise NoAvailableVet()
+
+
+class VetPool:
+    """Motor de asignación que agrupa a los veterinarios por especialidad y día.
+
+    Cada par (especialidad, fecha) tiene un min-heap ordenado por (nº de citas del día, posición
+    original), de modo que elige el mismo veterinario que `allocate_appointment` en O(log V). Los
+    heaps se construyen la primera vez que se pide esa fecha y los veterinarios llenos se retiran.
+    Una vez creado el pool, asignaciones y cancelaciones deben pasar por él; no es seguro entre hilos.
+    """
+
+    def __init__(self, veterinarians: list[Veterinarian]):
+        self._by_specialty: dict[str, list[tuple[int, Veterinarian]]] = {}
+        self._positions: dict[int, int] = {}  # id(vet) -> posición original
+        for position, vet in enumerate(veterinarians):
+            self._positions[id(vet)] = position
+            self._by_specialty.setdefault(vet.specialty, []).append((position, vet))
+        self._heaps: dict[tuple[str, object], list[tuple[int, int, Veterinarian]]] = {}
+        self._live: dict[tuple[object, int], int] = {}  # (fecha, posición) -> carga de su entrada vigente
+
+    def _heap(self, specialty: str, date) -> list[tuple[int, int, Veterinarian]]:
+        heap = self._heaps.get((specialty, date))
+        if heap is None:
+            heap = self._heaps[(specialty, date)] = []
+            for position, vet in self._by_specialty.get(specialty, ()):
+                self._push(heap, vet, position, date)
+            heapq.heapify(heap)
+        return heap
+
+    def _push(self, heap, vet: Veterinarian, position: int, date, heap_push=False):
+        load = vet.load_on(date)
+        if load >= vet.max_daily_appointments:
+            self._live.pop((date, position), None)
+            return
+        self._live[(date, position)] = load
+        if heap_push:
+            heapq.heappush(heap, (load, position, vet))
+        else:
+            heap.append((load, position, vet))
+
+    def allocate(self, appointment: AppointmentRequest):
+        vet = self._take(appointment)
+        if vet is None:
+            raise NoAvailableVet()
+        return vet.id
+
+    def _take(self, appointment: AppointmentRequest) -> Veterinarian | None:
+        date = appointment.date
+        heap = self._heap(appointment.specialty, date)
+        while heap:
+            load, position, vet = heap[0]
+            if self._live.get((date, position)) != load:
+                heapq.heappop(heap)  # entrada obsoleta
+                continue
+            heapq.heappop(heap)
+            if load != vet.load_on(date):
+                # La carga cambió fuera del pool: se reinserta con la carga real
+                self._push(heap, vet, position, date, heap_push=True)
+                continue
+            vet.assign_appointment(appointment)
+            self._push(heap, vet, position, date, heap_push=True)
+            return vet
+        return None
+
+    def cancel(self, vet: Veterinarian, appointment: AppointmentRequest):
+        vet.cancel_appointment(appointment)
+        heap = self._heaps.get((vet.specialty, appointment.date))
+        if heap is not None:
+            self._push(heap, vet, self._positions[id(vet)], appointment.date, heap_push=True)
+
+
+@dataclass
+class AllocationResult:
+    assignments: dict[UUID, UUID] = field(default_factory=dict)  # id de la solicitud -> id del veterinario
+    unallocated: list[AppointmentRequest] = field(default_factory=list)
+
+
+def allocate_many(requests: list[AppointmentRequest], veterinarians: list[Veterinarian]) -> AllocationResult:
+    """Asigna un lote de solicitudes en una sola pasada.
+
+    Produce las mismas asignaciones que llamar a `allocate_appointment` en orden, pero las solicitudes
+    se agrupan por (especialidad, fecha) en los heaps del pool, las cargas se calculan una sola vez y las
+    solicitudes sin veterinario se devuelven en lugar de lanzar `NoAvailableVet`.
+    """
+    pool = VetPool(veterinarians)
+    result = AllocationResult()
+    for request in requests:
+        vet = pool._take(request)
+        if vet is None:
+            result.unallocated.append(request)
+        else:
+            result.assignments[request.id] = vet.id
+    return result
@@ -0,0 +1,259 @@
+"""Asignación repartida en shards entre varios procesos.
+
+Los veterinarios se parten en shards (por defecto por especialidad; p. ej. por clínica con
+`partition`) y cada shard vive en un único proceso trabajador, dueño de sus objetos `Veterinarian` y
+de un `VetPool` persistente. Cada solicitud va a su shard de origen (`route`) y, si allí no hay
+veterinario, prueba el resto de shards con su especialidad, en orden. Con un solo shard el resultado
+es idéntico a `allocate_appointment` solicitud a solicitud.
+"""
+
+import multiprocessing
+import pickle
+import time
+from array import array
+from typing import Callable, Hashable
+from uuid import UUID
+
+from .exceptions import NoAvailableVet
+from .models import AllocationResult, AppointmentRequest, Veterinarian, VetPool
+
+
+def by_specialty(item: Veterinarian | AppointmentRequest) -> str:
+    return item.specialty
+
+
+def _pack(strings: list[str]) -> str | list[str]:
+    """Una columna de textos distintos viaja como un único texto: serializarlo es copiar memoria."""
+    packed = "\0".join(strings)
+    return packed if packed.count("\0") == len(strings) - 1 else strings
+
+
+def _unpack(packed: str | list[str], count: int) -> list[str]:
+    if isinstance(packed, list):
+        return packed
+    return packed.split("\0") if count else []
+
+
+def _serve(connection, shards: dict[int, list[tuple[int, Veterinarian]]]):
+    """Bucle del proceso trabajador. Los shards se identifican por número y los veterinarios por su
+    índice global; -1 / None significa que el shard no tenía hueco."""
+    pools = {number: VetPool([vet for _, vet in vets]) for number, vets in shards.items()}
+    index_of = {id(vet): index for vets in shards.values() for index, vet in vets}
+    while (message := connection.recv()) is not None:
+        command, payload = message
+        if command == "route":
+            # Solo la porción de este proceso, en columnas y en orden de llegada
+            client_names, pet_names, specialties, date_codes, dates, ids, uuid_ids, homes = pickle.loads(
+                connection.recv_bytes()
+            )
+            client_names, pet_names = _unpack(client_names, len(homes)), _unpack(pet_names, len(homes))
+            if uuid_ids:
+                ids = [UUID(int=request_id) for request_id in ids]
+            dates = [dates[code] for code in date_codes]
+            vet_indexes = array("q")
+            for request in map(AppointmentRequest, client_names, pet_names, specialties, dates, ids):
+                vet = pools[homes[len(vet_indexes)]]._take(request)
+                vet_indexes.append(index_of[id(vet)] if vet else -1)
+            connection.send_bytes(vet_indexes.tobytes())
+        elif command == "allocate":
+            replies = []
+            for number, rows in payload:
+                take = pools[number]._take
+                replies.append([index_of[id(vet)] if (vet := take(AppointmentRequest(*row))) else None for row in rows])
+            connection.send(replies)
+        elif command == "veterinarians":
+            connection.send([item for vets in shards.values() for item in vets])
+    connection.close()
+
+
+class ShardedAllocator:
+    """Servicio de asignación con los veterinarios repartidos en `workers` procesos.
+
+    Tras crearlo, el estado vive en los trabajadores: los objetos `Veterinarian` del llamador no se
+    actualizan y `veterinarians()` devuelve el estado actual. Hay que cerrarlo con `close()` o `with`.
+    `parent_seconds` guarda el tiempo de CPU que el último `allocate_many` consumió en este proceso (sin
+    contar la espera a los trabajadores): es la parte serie que limita el escalado.
+    """
+
+    def __init__(
+        self,
+        veterinarians: list[Veterinarian],
+        workers: int | None = None,
+        partition: Callable[[Veterinarian], Hashable] = by_specialty,
+        route: Callable[[AppointmentRequest], Hashable] = by_specialty,
+        context: multiprocessing.context.BaseContext | None = None,
+    ):
+        self.route = route
+        self.parent_seconds = 0.0
+        self._vet_ids = [vet.id for vet in veterinarians]
+        shards: dict[int, list[tuple[int, Veterinarian]]] = {}
+        numbers: dict[Hashable, int] = {}  # clave del shard -> número
+        self._home_shard: dict[tuple[str, Hashable], int] = {}  # (especialidad, clave) -> número
+        self._shards_by_specialty: dict[str, list[int]] = {}
+        for index, vet in enumerate(veterinarians):
+            number = numbers.setdefault(partition(vet), len(numbers))
+            shards.setdefault(number, []).append((index, vet))
+            self._home_shard[(vet.specialty, partition(vet))] = number
+            keys = self._shards_by_specialty.setdefault(vet.specialty, [])
+            if number not in keys:
+                keys.append(number)
+
+        # Reparto de shards entre procesos: el más grande al proceso con menos veterinarios
+        workers = max(1, min(workers or multiprocessing.cpu_count(), len(shards)))
+        assigned: list[dict[int, list[tuple[int, Veterinarian]]]] = [{} for _ in range(workers)]
+        sizes = [0] * workers
+        self._worker_of: dict[int, int] = {}
+        for number, vets in sorted(shards.items(), key=lambda item: -len(item[1])):
+            worker = sizes.index(min(sizes))
+            assigned[worker][number] = vets
+            sizes[worker] += len(vets)
+            self._worker_of[number] = worker
+
+        context = context or multiprocessing.get_context()
+        self._connections = []
+        self._processes = []
+        for worker_shards in assigned:
+            parent, child = context.Pipe()
+            process = context.Process(target=_serve, args=(child, worker_shards), daemon=True)
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+
+    def _homes(self, requests: list[AppointmentRequest]) -> list[int]:
+        """Número del shard de origen de cada solicitud o, si ese shard no tiene su especialidad, el del
+        primero que la tenga (-1 si ninguno)."""
+        route, home_shard = self.route, self._home_shard
+        first = {specialty: shards[0] for specialty, shards in self._shards_by_specialty.items()}
+        return [home_shard.get((r.specialty, route(r)), first.get(r.specialty, -1)) for r in requests]
+
+    @staticmethod
+    def _columns(requests: list[AppointmentRequest], homes: list[int]) -> bytes:
+        dates: dict[object, int] = {}
+        date_codes = [dates.setdefault(r.date, len(dates)) for r in requests]
+        ids = [r.id for r in requests]
+        # Los UUID viajan como enteros: se serializan mucho más rápido
+        uuid_ids = all(type(request_id) is UUID for request_id in ids)
+        if uuid_ids:
+            ids = [request_id.int for request_id in ids]
+        columns = (
+            _pack([r.client_name for r in requests]),
+            _pack([r.pet_name for r in requests]),
+            [r.specialty for r in requests],
+            date_codes,
+            list(dates),
+            ids,
+            uuid_ids,
+            homes,
+        )
+        return pickle.dumps(columns, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def allocate_many(self, requests: list[AppointmentRequest]) -> AllocationResult:
+        """Primera ronda: cada proceso recibe solo las solicitudes de sus shards y las asigna en paralelo.
+        Las solicitudes sin hueco en su origen prueban, ronda a ronda, el resto de shards con su
+        especialidad; en cada ronda una solicitud solo está en un shard."""
+        started = time.process_time()
+        homes = self._homes(requests)
+        positions: list[list[int]] = [[] for _ in self._connections]
+        worker_of = self._worker_of
+        for position, home in enumerate(homes):
+            if home >= 0:
+                positions[worker_of[home]].append(position)
+        # Cada porción se envía en cuanto está lista: el primer proceso trabaja mientras se preparan las demás
+        for connection, slice_positions in zip(self._connections, positions):
+            if len(slice_positions) == len(requests):
+                connection.send(("route", None))
+                connection.send_bytes(self._columns(requests, homes))
+            elif slice_positions:
+                sliced = [requests[position] for position in slice_positions]
+                connection.send(("route", None))
+                connection.send_bytes(self._columns(sliced, [homes[position] for position in slice_positions]))
+        assigned: list[int | None] = [None] * len(requests)
+        failed: list[int] = []
+        for connection, slice_positions in zip(self._connections, positions):
+            if not slice_positions:
+                continue
+            reply = connection.recv_bytes()
+            vet_indexes = array("q")
+            vet_indexes.frombytes(reply)
+            for position, vet_index in zip(slice_positions, vet_indexes):
+                if vet_index >= 0:
+                    assigned[position] = vet_index
+                else:
+                    failed.append(position)
+        self._fallback(requests, sorted(failed), homes, assigned)
+
+        vet_ids = self._vet_ids
+        result = AllocationResult()
+        result.assignments = {
+            request.id: vet_ids[vet_index] for request, vet_index in zip(requests, assigned) if vet_index is not None
+        }
+        result.unallocated = [request for request, vet_index in zip(requests, assigned) if vet_index is None]
+        self.parent_seconds = time.process_time() - started
+        return result
+
+    def _fallback(self, requests, pending: list[int], homes: list[int], assigned: list[int | None]):
+        """Rondas de respaldo solo para las solicitudes que no cupieron."""
+        fallbacks = {
+            position: [number for number in reversed(self._shards_by_specialty[requests[position].specialty])
+                       if number != homes[position]]
+            for position in pending
+        }
+        pending = [position for position in pending if fallbacks[position]]
+        while pending:
+            batches: list[dict[int, list[int]]] = [{} for _ in self._connections]
+            for position in pending:
+                number = fallbacks[position].pop()
+                batches[self._worker_of[number]].setdefault(number, []).append(position)
+            for connection, batch in zip(self._connections, batches):
+                if batch:
+                    payload = [
+                        (number, [self._row(requests[position]) for position in positions])
+                        for number, positions in batch.items()
+                    ]
+                    connection.send(("allocate", payload))
+            pending = []
+            for connection, batch in zip(self._connections, batches):
+                if batch:
+                    replies = connection.recv()
+                    for positions, vet_indexes in zip(batch.values(), replies):
+                        for position, vet_index in zip(positions, vet_indexes):
+                            if vet_index is not None:
+                                assigned[position] = vet_index
+                            elif fallbacks[position]:
+                                pending.append(position)
+            pending.sort()
+
+    def allocate(self, appointment: AppointmentRequest):
+        result = self.allocate_many([appointment])
+        if result.unallocated:
+            raise NoAvailableVet()
+        return result.assignments[appointment.id]
+
+    @staticmethod
+    def _row(request: AppointmentRequest) -> tuple:
+        # Una tupla se serializa mucho más rápido que la dataclass
+        return (request.client_name, request.pet_name, request.specialty, request.date, request.id)
+
+    def veterinarians(self) -> list[Veterinarian]:
+        """Copia del estado actual de todos los veterinarios, en el orden original."""
+        vets: list[Veterinarian | None] = [None] * len(self._vet_ids)
+        for connection in self._connections:
+            connection.send(("veterinarians", None))
+        for connection in self._connections:
+            for index, vet in connection.recv():
+                vets[index] = vet
+        return vets
+
+    def close(self):
+        for connection, process in zip(self._connections, self._processes):
+            connection.send(None)
+            connection.close()
+            process.join()
+        self._connections, self._processes = [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,46 @@
+import random
+
+from .allocation import BalancedStrategy, GreedyStrategy
+from .models import AppointmentRequest, Veterinarian
+
+
+def build(seed):
+    rng = random.Random(seed)
+    vets = [Veterinarian(f"Vet {i}", rng.choice(["canina", "felina"]), rng.randint(1, 6)) for i in range(8)]
+    specialties, days = ["canina", "felina"], ["2025-10-18", "2025-10-19", "2025-10-20"]
+    requests = [
+        AppointmentRequest("Cliente", f"Mascota {i}", rng.choice(specialties), rng.choice(days)) for i in range(60)
+    ]
+    return vets, requests
+
+
+def peak_utilization(vets):
+    return max(vet.load_on(date) / vet.max_daily_appointments for vet in vets for date in vet._appointments_by_date)
+
+
+def test_balanced_strategy_allocates_as_many_as_greedy_with_lower_peak_utilization():
+    for seed in range(5):
+        vets, requests = build(seed)
+        greedy = GreedyStrategy().allocate(requests, vets)
+        greedy_peak = peak_utilization(vets)
+
+        vets, requests = build(seed)
+        balanced = BalancedStrategy().allocate(requests, vets)
+        balanced_peak = peak_utilization(vets)
+
+        assert len(balanced.assignments) == len(greedy.assignments)
+        assert balanced_peak <= greedy_peak
+        assert list(balanced.assignments) == [request.id for request in requests if request.id in balanced.assignments]
+
+
+def test_balanced_strategy_falls_back_to_greedy_when_out_of_time():
+    vets, requests = build(0)
+    ticks = iter(range(100))
+    strategy = BalancedStrategy(time_budget=0, clock=lambda: next(ticks))
+
+    result = strategy.allocate(requests, vets)
+
+    expected_vets, expected_requests = build(0)
+    expected = GreedyStrategy().allocate(expected_requests, expected_vets)
+    assert len(result.assignments) == len(expected.assignments)
+    assert len(result.unallocated) == len(expected.unallocated)
@@ -0,0 +1,58 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from .booking import AsyncBookingService
+from .exceptions import NoAvailableVet
+from .models import AppointmentRequest, Veterinarian, allocate_appointment
+
+
+@pytest.fixture
+def vets():
+    return [
+        Veterinarian("Dra. López", "canina", max_daily_appointments=5),
+        Veterinarian("Dr. Pérez", "canina", max_daily_appointments=3),
+    ]
+
+
+def requests(n):
+    return [AppointmentRequest("Cliente", f"Mascota {i}", "canina", "2025-10-18") for i in range(n)]
+
+
+def test_concurrent_threads_never_overbook(vets):
+    def allocate(appointment):
+        try:
+            return allocate_appointment(appointment, vets)
+        except NoAvailableVet:
+            return None
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(allocate, requests(50)))
+
+    assert sum(result is not None for result in results) == 8
+    assert [vet.load_on("2025-10-18") for vet in vets] == [5, 3]
+
+
+def test_async_bookings_never_overbook_while_waiting_for_io(vets):
+    saved = []
+
+    async def save(vet, appointment):
+        await asyncio.sleep(0)
+        saved.append((vet.id, appointment.id))
+
+    results = asyncio.run(AsyncBookingService(vets, save).book_many(requests(12)))
+
+    assert sum(isinstance(result, NoAvailableVet) for result in results) == 4
+    assert len(saved) == 8
+    assert [vet.load_on("2025-10-18") for vet in vets] == [5, 3]
+
+
+def test_failed_io_releases_the_slot(vets):
+    async def failing_save(vet, appointment):
+        raise ConnectionError()
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(AsyncBookingService(vets, failing_save).book(requests(1)[0]))
+
+    assert [vet.load_on("2025-10-18") for vet in vets] == [0, 0]
@@ -1,7 +1,7 @@
 import pytest  # noqa: F401
 
 from .exceptions import NoAvailableVet
-from .models import AppointmentRequest, Veterinarian, allocate_appointment
+from .models import AppointmentRequest, Veterinarian, VetPool, allocate_appointment, allocate_many
 
 
 @pytest.fixture
@@ -97,3 +97,103 @@ def test_raises_no_available_vet_when_no_vet_matches_specialty(vets):
 
     with pytest.raises(NoAvailableVet):
         allocate_appointment(exotic_appointment, vets)
+
+
+def test_vet_pool_chooses_same_vet_as_allocate_appointment():
+    specialties = ["canina", "felina", "exótica"]
+    vets_a = [Veterinarian(f"Vet {i}", specialties[i % 3], max_daily_appointments=1 + i % 4) for i in range(12)]
+    vets_b = [Veterinarian(vet.name, vet.specialty, vet.max_daily_appointments) for vet in vets_a]
+    pool = VetPool(vets_b)
+
+    index_a = {vet.id: i for i, vet in enumerate(vets_a)}
+    index_b = {vet.id: i for i, vet in enumerate(vets_b)}
+
+    for i in range(80):
+        day = f"2025-10-{18 + i % 2}"
+        appointment = AppointmentRequest("Cliente", f"Mascota {i}", specialties[(i * 7) % 3], day)
+        try:
+            expected = index_a[allocate_appointment(appointment, vets_a)]
+        except NoAvailableVet:
+            expected = None
+        try:
+            chosen = index_b[pool.allocate(appointment)]
+        except NoAvailableVet:
+            chosen = None
+        assert chosen == expected
+
+
+def test_vet_pool_readmits_vet_after_cancel(appointments_canina):
+    vet = Veterinarian("Dra. López", "canina", max_daily_appointments=1)
+    pool = VetPool([vet])
+    pool.allocate(appointments_canina[0])
+
+    with pytest.raises(NoAvailableVet):
+        pool.allocate(appointments_canina[1])
+
+    pool.cancel(vet, appointments_canina[0])
+    assert pool.allocate(appointments_canina[1]) == vet.id
+
+
+def test_allocate_many_matches_sequential_allocation(appointments_canina, appointments_felina):
+    requests = [*appointments_canina, *appointments_felina]
+    vets_a = [
+        Veterinarian("Dra. López", "canina", max_daily_appointments=7),
+        Veterinarian("Dr. Pérez", "canina", max_daily_appointments=5),
+        Veterinarian("Dra. Ramírez", "felina", max_daily_appointments=8),
+    ]
+    vets_b = [Veterinarian(vet.name, vet.specialty, vet.max_daily_appointments) for vet in vets_a]
+    index_a = {vet.id: i for i, vet in enumerate(vets_a)}
+    index_b = {vet.id: i for i, vet in enumerate(vets_b)}
+
+    expected, expected_unallocated = {}, []
+    for request in requests:
+        try:
+            expected[request.id] = index_a[allocate_appointment(request, vets_a)]
+        except NoAvailableVet:
+            expected_unallocated.append(request)
+
+    result = allocate_many(requests, vets_b)
+
+    assert {request_id: index_b[vet_id] for request_id, vet_id in result.assignments.items()} == expected
+    assert result.unallocated == expected_unallocated
+    assert len(result.unallocated) == 8
+
+
+def test_capacity_is_tracked_per_day(vet):
+    for day in ("2025-10-18", "2025-10-19"):
+        for i in range(3):
+            assert vet.assign_appointment(AppointmentRequest("Marcos", f"Roco {i}", "canina", day))
+
+    assert vet.load_on("2025-10-18") == 3
+    assert not vet.assign_appointment(AppointmentRequest("Juan", "Firulais", "canina", "2025-10-18"))
+
+
+def test_cancel_frees_a_slot_only_on_its_day(vet):
+    appointments = [AppointmentRequest("Marcos", f"Roco {i}", "canina", "2025-10-18") for i in range(3)]
+    for appointment in appointments:
+        vet.assign_appointment(appointment)
+
+    vet.cancel_appointment(appointments[0])
+
+    assert vet.load_on("2025-10-18") == 2
+    assert vet.assign_appointment(AppointmentRequest("Juan", "Firulais", "canina", "2025-10-18"))
+
+
+def test_appointment_request_is_an_immutable_value_object():
+    appointment = AppointmentRequest("Marcos", "Roco", "canina", "2025-10-18", id=1)
+
+    assert appointment == AppointmentRequest("Marcos", "Roco", "canina", "2025-10-18", id=1)
+    assert len({appointment, AppointmentRequest("Marcos", "Roco", "canina", "2025-10-18", id=1)}) == 1
+    with pytest.raises(AttributeError):
+        appointment.specialty = "felina"
+
+
+def test_events_are_only_recorded_when_asked():
+    silent = Veterinarian("Dra. López", "canina", max_daily_appointments=3)
+    recording = Veterinarian("Dr. Pérez", "canina", max_daily_appointments=3, record_events=True)
+    requests = [AppointmentRequest("Marcos", f"Roco {i}", "canina", "2025-10-18") for i in range(4)]
+
+    allocate_many(requests, [silent, recording])
+
+    assert silent.events == []
+    assert len(recording.events) == 2
@@ -0,0 +1,50 @@
+import datetime
+import json
+
+import pytest
+
+from .importer import import_appointments
+from .models import Veterinarian
+
+
+@pytest.fixture
+def vets():
+    return [Veterinarian("Dra. López", "canina", max_daily_appointments=2)]
+
+
+def test_import_csv_allocates_valid_rows_and_reports_rejected(tmp_path, vets):
+    path = tmp_path / "citas.csv"
+    path.write_text(
+        "client_name,pet_name,specialty,date\n"
+        "Marcos,Roco,canina,2025-10-18\n"
+        "Juan,,canina,2025-10-18\n"
+        "Pedro,Sansón,canina,18/10/2025\n"
+        "María,Leal,canina,2025-10-18\n"
+        "Ana,Luna,canina,2025-10-18\n",
+        encoding="utf-8",
+    )
+
+    report = import_appointments(path, vets, batch_size=2)
+
+    assert (report.read, report.allocated, report.unallocated) == (5, 2, 1)
+    assert [number for number, _ in report.rejected] == [3, 4]
+    assert vets[0]._appointments_by_date.keys() == {datetime.date(2025, 10, 18)}
+
+
+def test_import_jsonl_with_process_pool(tmp_path, vets):
+    path = tmp_path / "citas.jsonl"
+    rows = [
+        {"client_name": client, "pet_name": "Roco", "specialty": "canina", "date": "2025-10-19"}
+        for client in ("Marcos", "Juan", 5)
+    ]
+    lines = [json.dumps(row) for row in rows] + ["[1]", "42", "{no es json"]
+    path.write_text("\n".join(lines), encoding="utf-8")
+
+    rejected = []
+    report = import_appointments(
+        path, vets, workers=2, max_rejected=2, on_rejected=lambda *row: rejected.append(row)
+    )
+
+    assert (report.read, report.allocated, report.unallocated, report.rejected_count) == (6, 2, 1, 3)
+    assert [number for number, _ in report.rejected] == [4, 5]
+    assert [number for number, _ in rejected] == [4, 5, 6]
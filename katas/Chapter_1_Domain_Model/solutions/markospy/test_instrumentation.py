@@ -0,0 +1,129 @@
+import pytest
+
+from . import models
+from .exceptions import NoAvailableVet
+from .instrumentation import Instrumentation, instrument_allocation
+from .models import AppointmentRequest, Veterinarian
+
+
+@pytest.fixture
+def instrumentation():
+    instrumentation = Instrumentation()
+    instrument_allocation(instrumentation)
+    yield instrumentation
+    instrumentation.disable()
+
+
+def test_disabled_instrumentation_leaves_the_hot_path_untouched(instrumentation):
+    original, assign = models.allocate_appointment, Veterinarian.assign_appointment
+
+    instrumentation.enable()
+    assert models.allocate_appointment is not original
+    instrumentation.disable()
+
+    assert (models.allocate_appointment, Veterinarian.assign_appointment) == (original, assign)
+    with instrumentation.measure("bloque"):
+        pass
+    assert "bloque" not in instrumentation.operations
+
+
+def test_counts_calls_latency_and_failures_per_specialty(instrumentation, tmp_path):
+    vets = [Veterinarian("Dra. López", "canina", max_daily_appointments=1)]
+    instrumentation.enable()
+
+    models.allocate_appointment(AppointmentRequest("Marcos", "Roco", "canina", "2025-10-18"), vets)
+    for pet in ("Luna", "Sansón"):
+        with pytest.raises(NoAvailableVet):
+            models.allocate_appointment(AppointmentRequest("Ana", pet, "canina", "2025-10-18"), vets)
+    with pytest.raises(NoAvailableVet):
+        models.allocate_appointment(AppointmentRequest("Ana", "Misi", "felina", "2025-10-18"), vets)
+
+    snapshot = instrumentation.snapshot()
+    allocate = snapshot["operations"][f"{models.__name__}.allocate_appointment"]
+    assert (allocate["calls"], allocate["errors"]) == (4, 3)
+    assert sum(allocate["buckets"].values()) == 4
+    assert snapshot["operations"]["Veterinarian.assign_appointment"]["calls"] == 1
+    assert snapshot["allocation"]["canina"] == {"requests": 3, "failures": 2, "failure_rate": 2 / 3}
+    assert snapshot["allocation"]["felina"]["failure_rate"] == 1.0
+
+    path = tmp_path / "metrics.prom"
+    instrumentation.write_prometheus(path)
+    text = path.read_text(encoding="utf-8")
+    assert 'vet_allocation_failures_total{specialty="canina"} 2' in text
+    assert f'vet_latency_seconds_count{{operation="{models.__name__}.allocate_appointment"}} 4' in text
+    assert '_bucket{operation="Veterinarian.assign_appointment",le="+Inf"} 1' in text
+
+
+def test_instruments_any_class_and_captures_profile(instrumentation):
+    class Repository:
+        def get(self, id):
+            return id
+
+    instrumentation.instrument(Repository, "get")
+    instrumentation.enable()
+    with instrumentation.capture(profile=True, memory=True) as capture:
+        for id in range(3):
+            Repository().get(id)
+
+    assert instrumentation.snapshot()["operations"]["Repository.get"]["calls"] == 3
+    assert capture.profile.total_calls > 0
+    assert capture.memory_top
+
+
+def test_duplicate_targets_and_a_second_instance_do_not_leave_wrappers_behind(instrumentation):
+    original = models.allocate_appointment
+    instrument_allocation(instrumentation)
+    other = Instrumentation()
+    instrument_allocation(other)
+
+    instrumentation.enable()
+    assert models.allocate_appointment.__wrapped__ is original
+    with pytest.raises(RuntimeError):
+        other.enable()
+    instrumentation.disable()
+    other.enable()
+    other.disable()
+
+    assert models.allocate_appointment is original
+
+
+def test_disable_restores_inherited_methods(instrumentation):
+    class Base:
+        def get(self, id):
+            return id
+
+    class Repository(Base):
+        pass
+
+    instrumentation.instrument(Repository, "get")
+    instrumentation.enable()
+    assert Repository().get(1) == 1
+    instrumentation.disable()
+
+    assert "get" not in vars(Repository)
+
+
+def test_prometheus_escapes_label_values(instrumentation):
+    vets = [Veterinarian("Dra. López", 'can"ina\\\n', max_daily_appointments=1)]
+    instrumentation.enable()
+    models.allocate_appointment(AppointmentRequest("Marcos", "Roco", 'can"ina\\\n', "2025-10-18"), vets)
+
+    assert 'vet_allocation_requests_total{specialty="can\\"ina\\\\\\n"} 1' in instrumentation.prometheus()
+
+
+def test_keyword_calls_are_counted_and_metric_errors_never_replace_the_result(instrumentation):
+    vets = [Veterinarian("Dra. López", "canina", max_daily_appointments=1)]
+    instrumentation.enable()
+
+    vet_id = models.allocate_appointment(
+        appointment=AppointmentRequest("Marcos", "Roco", "canina", "2025-10-18"), veterinarians=vets
+    )
+    with pytest.raises(NoAvailableVet):
+        models.allocate_appointment(
+            appointment=AppointmentRequest("Ana", "Luna", "canina", "2025-10-18"), veterinarians=vets
+        )
+    instrumentation._count = None  # cualquier error al contar
+    assert models.allocate_appointment(AppointmentRequest("Ana", "Misi", "canina", "2025-10-19"), vets) == vets[0].id
+
+    assert vet_id == vets[0].id
+    assert instrumentation.snapshot()["allocation"]["canina"] == {"requests": 2, "failures": 1, "failure_rate": 0.5}
@@ -0,0 +1,49 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from .events import AppointmentAllocated, AppointmentCancelled, Event, VisitRecorded
+from .messagebus import MessageBus
+from .models import AppointmentRequest, Veterinarian, allocate_appointment
+
+
+def test_domain_events_are_collected_and_dispatched():
+    vet = Veterinarian("Dra. López", "canina", max_daily_appointments=3, record_events=True)
+    appointment = AppointmentRequest("Marcos", "Roco", "canina", "2025-10-18")
+    allocated, cancelled = [], []
+    bus = MessageBus()
+    bus.subscribe(AppointmentAllocated, allocated.append)
+    bus.subscribe(AppointmentCancelled, cancelled.append)
+
+    allocate_appointment(appointment, [vet])
+    vet.cancel_appointment(appointment)
+    bus.collect([vet])
+
+    assert bus.run_pending() == 2
+    assert allocated == [AppointmentAllocated(vet.id, appointment.id, "canina", "2025-10-18")]
+    assert cancelled == [AppointmentCancelled(vet.id, appointment.id, "canina", "2025-10-18")]
+    assert vet.events == []
+
+
+def test_handlers_for_base_classes_and_emitted_events_run_in_the_same_batch():
+    seen = []
+    bus = MessageBus()
+    bus.subscribe(Event, lambda event: seen.append(type(event).__name__))
+    bus.subscribe(AppointmentCancelled, lambda event: [VisitRecorded(event.vet_id, "Roco", event.date)])
+
+    bus.handle(AppointmentCancelled(None, 1, "canina", "2025-10-18"))
+
+    assert seen == ["AppointmentCancelled", "VisitRecorded"]
+
+
+def test_threaded_handlers_and_latency_counters():
+    def slow_io(event):
+        raise ConnectionError()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        bus = MessageBus(executor)
+        bus.subscribe(VisitRecorded, slow_io, threaded=True)
+        bus.publish_many(VisitRecorded(None, f"Mascota {i}", "2025-10-18") for i in range(10))
+        bus.run_pending()
+
+    assert bus.stats[slow_io].calls == 10
+    assert bus.stats[slow_io].errors == 10
+    assert bus.stats[slow_io].max_seconds >= bus.stats[slow_io].mean_seconds > 0
@@ -0,0 +1,69 @@
+import copy
+import datetime
+
+import pytest
+
+from .exceptions import NoAvailableVet
+from .models import AppointmentRequest, Veterinarian, allocate_appointment
+from .sharding import ShardedAllocator, _pack, _unpack
+
+
+def test_single_shard_matches_sequential_allocation():
+    vets = [Veterinarian(f"Vet {i}", ("canina", "felina")[i % 2], max_daily_appointments=1 + i % 3) for i in range(6)]
+    days = [datetime.date(2025, 10, 18) + datetime.timedelta(days=day) for day in range(2)]
+    requests = [
+        AppointmentRequest("Ana", f"Mascota {i}", ("canina", "felina")[i % 3 == 0], days[i % 2]) for i in range(20)
+    ]
+    expected = {}
+    sequential_vets = copy.deepcopy(vets)
+    for request in requests:
+        try:
+            expected[request.id] = allocate_appointment(request, sequential_vets)
+        except NoAvailableVet:
+            pass
+
+    with ShardedAllocator(vets, workers=2, partition=lambda vet: "única", route=lambda request: "única") as allocator:
+        result = allocator.allocate_many(requests)
+        loads = [vet.load_on(days[0]) for vet in allocator.veterinarians()]
+
+    assert result.assignments == expected
+    assert [request.id for request in result.unallocated] == [r.id for r in requests if r.id not in expected]
+    assert loads == [vet.load_on(days[0]) for vet in sequential_vets]
+
+
+def test_falls_back_to_other_clinics_when_the_home_shard_is_full():
+    centro = Veterinarian("Dra. López", "canina", max_daily_appointments=1)
+    norte = Veterinarian("Dr. Pérez", "canina", max_daily_appointments=1)
+    clinics = {centro.id: "centro", norte.id: "norte"}
+    requests = [AppointmentRequest(f"Cliente {i}", "Roco", "canina", "2025-10-18") for i in range(3)]
+
+    with ShardedAllocator(
+        [centro, norte], workers=2, partition=lambda vet: clinics[vet.id], route=lambda request: "centro"
+    ) as allocator:
+        result = allocator.allocate_many(requests)
+        with pytest.raises(NoAvailableVet):
+            allocator.allocate(AppointmentRequest("Ana", "Misi", "felina", "2025-10-18"))
+
+    assert result.assignments == {requests[0].id: centro.id, requests[1].id: norte.id}
+    assert result.unallocated == [requests[2]]
+
+
+def test_keeps_integer_ids_and_measures_the_parent_share():
+    vets = [Veterinarian(f"Vet {i}", "canina", max_daily_appointments=1) for i in range(2)]
+    clinics = {vets[0].id: "centro", vets[1].id: "norte"}
+    requests = [AppointmentRequest("Ana", f"Mascota {i}", "canina", "2025-10-18", id=i) for i in range(3)]
+
+    with ShardedAllocator(
+        vets, workers=2, partition=lambda vet: clinics[vet.id], route=lambda request: "norte"
+    ) as allocator:
+        result = allocator.allocate_many(requests)
+        stored = {request.id for vet in allocator.veterinarians() for request in vet._appointments}
+
+    assert result.assignments == {0: vets[1].id, 1: vets[0].id}
+    assert stored == {0, 1}
+    assert 0 <= allocator.parent_seconds
+
+
+def test_text_columns_round_trip_even_with_the_separator():
+    for strings in ([], [""], ["Ana", "Luis"], ["a\0b", "c"]):
+        assert _unpack(_pack(strings), len(strings)) == strings
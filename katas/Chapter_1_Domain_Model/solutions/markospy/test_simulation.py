@@ -0,0 +1,43 @@
+import random
+
+import pytest
+
+from .exceptions import NoAvailableVet
+from .models import AppointmentRequest, Veterinarian, allocate_appointment
+
+np = pytest.importorskip("numpy")
+from .simulation import encode, simulate  # noqa: E402
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_simulation_matches_object_based_allocation(seed):
+    rng = random.Random(seed)
+    specialties = ["canina", "felina", "exótica"]
+    vets = [Veterinarian(f"Vet {i}", rng.choice(specialties), rng.randint(0, 5)) for i in range(rng.randint(1, 15))]
+    for vet in vets[:3]:
+        vet.assign_appointment(AppointmentRequest("Previa", "Luna", vet.specialty, 2))
+    requests = [
+        AppointmentRequest("Cliente", f"Mascota {i}", rng.choice(specialties), rng.randrange(5)) for i in range(120)
+    ]
+
+    arrays, dates = encode(vets, requests)
+    result = simulate(**arrays)
+
+    index = {vet.id: i for i, vet in enumerate(vets)}
+    expected = []
+    for request in requests:
+        try:
+            expected.append(index[allocate_appointment(request, vets)])
+        except NoAvailableVet:
+            expected.append(-1)
+    assert result.assigned_vet.tolist() == expected
+    assert result.load.tolist() == [[vet.load_on(date) for date in dates] for vet in vets]
+    assert result.allocation_rate == sum(vet != -1 for vet in expected) / len(requests)
+    assert ((result.utilization >= 0) & (result.utilization <= 1)).all()
+
+
+def test_simulation_without_matching_vets_allocates_nothing():
+    result = simulate(np.array([0]), np.array([2]), np.array([1, 1]), np.array([0, 0]))
+
+    assert result.assigned_vet.tolist() == [-1, -1]
+    assert result.allocation_rate == 0
@@ -0,0 +1,62 @@
+from .messagebus import MessageBus
+from .models import AppointmentRequest, Veterinarian, allocate_appointment
+from .views import AvailabilityView
+
+
+def test_availability_view_follows_allocations_and_cancellations():
+    lopez = Veterinarian("Dra. López", "canina", max_daily_appointments=2, record_events=True)
+    perez = Veterinarian("Dr. Pérez", "canina", max_daily_appointments=1, record_events=True)
+    vets = [lopez, perez]
+    already_booked = AppointmentRequest("Ana", "Luna", "canina", "2025-10-18")
+    lopez.assign_appointment(already_booked)
+    view = AvailabilityView(vets)
+    bus = MessageBus()
+    view.subscribe(bus)
+
+    appointment = AppointmentRequest("Marcos", "Roco", "canina", "2025-10-18")
+    allocate_appointment(appointment, vets)
+    bus.collect(vets)
+    bus.run_pending()
+
+    assert view.free_vets("canina", "2025-10-18") == {lopez.id: 1}
+    assert view.schedule(perez.id, "2025-10-18") == [appointment.id]
+    assert view.free_vets("canina", "2025-10-19") == {lopez.id: 2, perez.id: 1}
+    assert not view.has_availability("felina", "2025-10-18")
+
+    lopez.cancel_appointment(already_booked)
+    bus.collect(vets)
+    bus.run_pending()
+
+    assert view.remaining(lopez.id, "canina", "2025-10-18") == 2
+    assert view.schedule(lopez.id, "2025-10-18") == []
+
+
+def test_seeded_allocations_are_not_applied_again_from_uncollected_events():
+    lopez = Veterinarian("Dra. López", "canina", max_daily_appointments=2, record_events=True)
+    perez = Veterinarian("Dr. Pérez", "canina", max_daily_appointments=1, record_events=True)
+    lopez.assign_appointment(AppointmentRequest("Ana", "Luna", "canina", "2025-10-18"))
+    perez.assign_appointment(AppointmentRequest("Juan", "Sansón", "canina", "2025-10-18"))
+    view = AvailabilityView([lopez, perez])
+    bus = MessageBus()
+    view.subscribe(bus)
+
+    bus.collect([lopez, perez])
+    bus.run_pending()
+
+    assert view.remaining(lopez.id, "canina", "2025-10-18") == 1
+    assert view.free_vets("canina", "2025-10-18") == {lopez.id: 1}
+
+
+def test_queries_do_not_store_untouched_days():
+    lopez = Veterinarian("Dra. López", "canina", max_daily_appointments=2, record_events=True)
+    perez = Veterinarian("Dr. Pérez", "felina", max_daily_appointments=0)
+    view = AvailabilityView([lopez, perez])
+
+    assert view.free_vets("canina", "2025-10-20") == {lopez.id: 2}
+    assert view.remaining(lopez.id, "canina", "2025-10-21") == 2
+    assert view.remaining(lopez.id, "felina", "2025-10-21") == 0
+    assert view.remaining(perez.id, "felina", "2025-10-21") == 0
+    assert view.has_availability("canina", "2025-10-22")
+    assert not view.has_availability("felina", "2025-10-22")
+    assert not view.has_availability("exótica", "2025-10-22")
+    assert view._free == {}
@@ -0,0 +1,83 @@
+from uuid import UUID
+
+from .events import AppointmentAllocated, AppointmentCancelled
+from .messagebus import MessageBus
+from .models import Veterinarian
+
+
+class AvailabilityView:
+    """Modelo de lectura (CQRS) de disponibilidad, mantenido con los eventos de asignación y cancelación.
+
+    Por (especialidad, fecha) guarda solo los veterinarios con huecos libres y cuántos les quedan, y por
+    (veterinario, fecha) su agenda. Las consultas nunca tocan el modelo de escritura.
+    """
+
+    def __init__(self, veterinarians: list[Veterinarian]):
+        # Capacidad de un día sin citas: por especialidad, los veterinarios que admiten alguna y cuántas
+        self._full: dict[str, dict[UUID, int]] = {}
+        self._free: dict[tuple[str, object], dict[UUID, int]] = {}
+        self._schedules: dict[tuple[UUID, object], dict[UUID | int, None]] = {}
+        for vet in veterinarians:
+            full = self._full.setdefault(vet.specialty, {})
+            if vet.max_daily_appointments > 0:
+                full[vet.id] = vet.max_daily_appointments
+        # Estado inicial: citas ya asignadas antes de crear la vista. Sus eventos AppointmentAllocated
+        # pueden seguir sin recoger en los veterinarios: los manejadores ignoran lo ya aplicado.
+        for vet in veterinarians:
+            for date, appointments in vet._appointments_by_date.items():
+                for appointment in appointments:
+                    self.on_allocated(AppointmentAllocated(vet.id, appointment.id, vet.specialty, date))
+
+    def subscribe(self, bus: MessageBus):
+        bus.subscribe(AppointmentAllocated, self.on_allocated)
+        bus.subscribe(AppointmentCancelled, self.on_cancelled)
+
+    def _free_vets(self, specialty: str, date) -> dict[UUID, int]:
+        """Solo para los manejadores: guarda el día, que a partir de ahora cambia con los eventos."""
+        free = self._free.get((specialty, date))
+        if free is None:
+            free = self._free[(specialty, date)] = dict(self._full.get(specialty, {}))
+        return free
+
+    def on_allocated(self, event: AppointmentAllocated):
+        # La agenda registra las citas ya aplicadas, así un evento repetido no descuenta dos veces
+        schedule = self._schedules.setdefault((event.vet_id, event.date), {})
+        if event.appointment_id in schedule:
+            return
+        schedule[event.appointment_id] = None
+        free = self._free_vets(event.specialty, event.date)
+        remaining = free.get(event.vet_id, 0) - 1
+        if remaining > 0:
+            free[event.vet_id] = remaining
+        else:
+            free.pop(event.vet_id, None)
+
+    def on_cancelled(self, event: AppointmentCancelled):
+        schedule = self._schedules.get((event.vet_id, event.date))
+        if not schedule or event.appointment_id not in schedule:
+            return
+        del schedule[event.appointment_id]
+        free = self._free_vets(event.specialty, event.date)
+        free[event.vet_id] = free.get(event.vet_id, 0) + 1
+
+    # Consultas
+
+    def has_availability(self, specialty: str, date) -> bool:
+        free = self._free.get((specialty, date))
+        if free is None:
+            free = self._full.get(specialty)
+        return bool(free)
+
+    def free_vets(self, specialty: str, date) -> dict[UUID, int]:
+        """Veterinarios con huecos libres ese día y cuántos les quedan."""
+        free = self._free.get((specialty, date))
+        return dict(free if free is not None else self._full.get(specialty, {}))
+
+    def remaining(self, vet_id: UUID, specialty: str, date) -> int:
+        free = self._free.get((specialty, date))
+        if free is None:
+            free = self._full.get(specialty, {})
+        return free.get(vet_id, 0)
+
+    def schedule(self, vet_id: UUID, date) -> list[UUID | int]:
+        return list(self._schedules.get((vet_id, date), ()))
@@ -1,5 +1,7 @@
+import datetime
+from typing import Iterable, Iterator
 from uuid import UUID
-from solution import Pet
+from solution import Pet, Visit
 from abc import ABC, abstractmethod
 
 
@@ -12,7 +14,66 @@ class AbstractPetRepository(ABC):
     def get(self, id: UUID) -> Pet:
         raise NotImplementedError
     
+    def add_many(self, pets: Iterable[Pet]) -> None:
+        for pet in pets:
+            self.add(pet)
+
+    def get_many(self, ids: Iterable[UUID]) -> list[Pet]:
+        return [pet for pet in map(self.get, ids) if pet is not None]
+
+    def add_visits(self, appended: Iterable[tuple[Pet, int]]) -> None:
+        """Persists visits appended to stored pets, given as (pet, index of its first unsaved visit).
+        By default the whole pet is written again."""
+        self.add_many([pet for pet, _ in appended])
+
+    def update_many(self, pets: Iterable[Pet]) -> None:
+        """Persists changes to the header (name, species, owner) of stored pets.
+        By default the whole pet is written again."""
+        self.add_many(pets)
+
+    def save_changes(
+        self, new_pets: list[Pet], appended: list[tuple[Pet, int]], updated: list[Pet] = ()
+    ) -> None:
+        """Writes the changes of a unit of work; backends with transactions do it in a single one."""
+        self.add_many(new_pets)
+        self.update_many(updated)
+        self.add_visits(appended)
+
+    # Visit history of a stored pet, used to fill LazyVisits; by default read from the whole pet
+    def visits_of(self, id: UUID) -> list[Visit]:
+        pet = self.get(id)
+        return list(pet.visits) if pet is not None else []
+
+    def count_visits(self, id: UUID) -> int:
+        return len(self.visits_of(id))
+
+    def recent_visits(self, id: UUID, limit: int) -> list[Visit]:
+        """Last `limit` visits in chronological order."""
+        return self.visits_of(id)[-limit:] if limit > 0 else []
+
+    @abstractmethod
+    def list_page(self, after_id: UUID | None = None, limit: int = 100) -> list[Pet]:
+        """Returns up to `limit` pets ordered by id, starting right after `after_id` (keyset pagination)."""
+        raise NotImplementedError
+
+    def iter_all(self, batch_size: int = 500) -> Iterator[Pet]:
+        after_id = None
+        while page := self.list_page(after_id, batch_size):
+            yield from page
+            after_id = page[-1].id
+
+    # Queries by secondary attributes; the default implementation is a full scan ordered by id
+    def find_by_owner(self, owner_name: str) -> list[Pet]:
+        return [pet for pet in self.iter_all() if pet.owner_name == owner_name]
+
+    def find_by_species(self, species: str) -> list[Pet]:
+        return [pet for pet in self.iter_all() if pet.species == species]
+
+    def find_by_visit_date(self, date: datetime.date) -> list[Pet]:
+        return [pet for pet in self.iter_all() if any(visit.date == date for visit in pet.visits)]
+
     @abstractmethod
     def list(self) -> list[Pet]:
         raise NotImplementedError
 
+
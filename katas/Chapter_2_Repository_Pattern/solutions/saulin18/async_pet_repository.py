@@ -0,0 +1,67 @@
+import asyncio
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Iterable
+from uuid import UUID
+
+from abstract_pet_repository import AbstractPetRepository
+from solution import Pet
+
+
+class AbstractAsyncPetRepository(ABC):
+    @abstractmethod
+    async def add(self, pet: Pet) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get(self, id: UUID) -> Pet:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def add_many(self, pets: Iterable[Pet]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_many(self, ids: Iterable[UUID]) -> list[Pet]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def list_page(self, after_id: UUID | None = None, limit: int = 100) -> list[Pet]:
+        raise NotImplementedError
+
+    async def iter_all(self, batch_size: int = 500) -> AsyncIterator[Pet]:
+        after_id = None
+        while page := await self.list_page(after_id, batch_size):
+            for pet in page:
+                yield pet
+            after_id = page[-1].id
+
+
+class AsyncPetRepository(AbstractAsyncPetRepository):
+    """Runs a synchronous repository on its own worker thread so its I/O never blocks the event loop.
+    The repository is built on that thread too, which keeps an SQLite connection on the thread that uses it."""
+
+    def __init__(self, repository_factory: Callable[[], AbstractPetRepository]) -> None:
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pet-repository")
+        self.repository = self.executor.submit(repository_factory).result()
+
+    async def _run(self, method, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, method, *args)
+
+    async def add(self, pet: Pet) -> None:
+        await self._run(self.repository.add, pet)
+
+    async def get(self, id: UUID) -> Pet:
+        return await self._run(self.repository.get, id)
+
+    async def add_many(self, pets: Iterable[Pet]) -> None:
+        await self._run(self.repository.add_many, list(pets))
+
+    async def get_many(self, ids: Iterable[UUID]) -> list[Pet]:
+        return await self._run(self.repository.get_many, list(ids))
+
+    async def list_page(self, after_id: UUID | None = None, limit: int = 100) -> list[Pet]:
+        return await self._run(self.repository.list_page, after_id, limit)
+
+    def close(self) -> None:
+        self.executor.shutdown()
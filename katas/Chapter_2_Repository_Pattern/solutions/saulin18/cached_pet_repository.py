@@ -0,0 +1,151 @@
+import datetime
+import time
+from collections import OrderedDict
+from typing import Callable, Iterable
+from uuid import UUID
+
+from abstract_pet_repository import AbstractPetRepository
+from solution import LazyVisits, Pet
+
+# Immutable copy of a pet: (id, name, species, owner_name, visits). Visits are frozen, so a tuple of
+# them can be shared; unloaded lazy visits are kept as a template that is never loaded itself.
+PetSnapshot = tuple
+
+
+def freeze(pet: Pet) -> PetSnapshot:
+    visits = pet.visits
+    if isinstance(visits, LazyVisits) and not visits.loaded and not visits.appended:
+        frozen_visits = visits.unloaded_copy()
+    else:
+        frozen_visits = tuple(visits)
+    return (pet.id, pet.name, pet.species, pet.owner_name, frozen_visits)
+
+
+def thaw(snapshot: PetSnapshot) -> Pet:
+    id, name, species, owner_name, visits = snapshot
+    pet = Pet(id, name, species, owner_name)
+    pet.visits = visits.unloaded_copy() if isinstance(visits, LazyVisits) else list(visits)
+    return pet
+
+
+class PetCache():
+    """LRU cache with optional TTL shared by every CachedPetRepository of the process.
+    It stores immutable snapshots and every `get` builds a new Pet, so units of work never share instances."""
+
+    def __init__(self, max_size: int = 10_000, ttl: float | None = None, clock: Callable[[], float] = time.monotonic) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self.entries: OrderedDict[UUID, tuple[PetSnapshot, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, id: UUID) -> Pet | None:
+        entry = self.entries.get(id)
+        if entry is None:
+            self.misses += 1
+            return None
+        snapshot, stored_at = entry
+        if self.ttl is not None and self.clock() - stored_at > self.ttl:
+            del self.entries[id]
+            self.evictions += 1
+            self.misses += 1
+            return None
+        self.entries.move_to_end(id)
+        self.hits += 1
+        return thaw(snapshot)
+
+    def put(self, pet: Pet) -> None:
+        self.entries[pet.id] = (freeze(pet), self.clock())
+        self.entries.move_to_end(pet.id)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, id: UUID) -> None:
+        self.entries.pop(id, None)
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "size": len(self.entries)}
+
+
+class CachedPetRepository(AbstractPetRepository):
+    """Wraps any repository with an identity map (one instance per pet for the lifetime of this
+    repository, i.e. one unit of work) in front of a shared PetCache."""
+
+    def __init__(self, repository: AbstractPetRepository, cache: PetCache | None = None) -> None:
+        self.repository = repository
+        self.cache = cache if cache is not None else PetCache()
+        self.identity_map: dict[UUID, Pet] = {}
+
+    def add(self, pet: Pet) -> None:
+        self.repository.add(pet)
+        self.cache.invalidate(pet.id)
+        self.identity_map[pet.id] = pet
+
+    def add_many(self, pets: Iterable[Pet]) -> None:
+        pets = list(pets)
+        self.repository.add_many(pets)
+        self._invalidate(pets)
+
+    def add_visits(self, appended: Iterable[tuple[Pet, int]]) -> None:
+        appended = list(appended)
+        self.repository.add_visits(appended)
+        self._invalidate(pet for pet, _ in appended)
+
+    def update_many(self, pets: Iterable[Pet]) -> None:
+        pets = list(pets)
+        self.repository.update_many(pets)
+        self._invalidate(pets)
+
+    def save_changes(
+        self, new_pets: list[Pet], appended: list[tuple[Pet, int]], updated: list[Pet] = ()
+    ) -> None:
+        self.repository.save_changes(new_pets, appended, updated)
+        self._invalidate([*new_pets, *updated, *(pet for pet, _ in appended)])
+
+    def _invalidate(self, pets: Iterable[Pet]) -> None:
+        for pet in pets:
+            self.cache.invalidate(pet.id)
+            self.identity_map[pet.id] = pet
+
+    def get(self, id: UUID) -> Pet:
+        pets = self.get_many([id])
+        return pets[0] if pets else None
+
+    def get_many(self, ids: Iterable[UUID]) -> list[Pet]:
+        ids = list(ids)
+        missing = []
+        for id in ids:
+            if id in self.identity_map:
+                continue
+            pet = self.cache.get(id)
+            if pet is None:
+                missing.append(id)
+            else:
+                self.identity_map[id] = pet
+        if missing:
+            for pet in self.repository.get_many(missing):
+                self.cache.put(pet)
+                self.identity_map[pet.id] = pet
+        return [self.identity_map[id] for id in ids if id in self.identity_map]
+
+    def list_page(self, after_id: UUID | None = None, limit: int = 100) -> list[Pet]:
+        return self._track(self.repository.list_page(after_id, limit))
+
+    def find_by_owner(self, owner_name: str) -> list[Pet]:
+        return self._track(self.repository.find_by_owner(owner_name))
+
+    def find_by_species(self, species: str) -> list[Pet]:
+        return self._track(self.repository.find_by_species(species))
+
+    def find_by_visit_date(self, date: datetime.date) -> list[Pet]:
+        return self._track(self.repository.find_by_visit_date(date))
+
+    def _track(self, pets: list[Pet]) -> list[Pet]:
+        # Pets already seen in this unit of work keep their instance
+        return [self.identity_map.setdefault(pet.id, pet) for pet in pets]
+
+    def list(self) -> list[Pet]:
+        return self._track(self.repository.list())
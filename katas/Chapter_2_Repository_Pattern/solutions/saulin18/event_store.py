@@ -0,0 +1,266 @@
+import datetime
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from uuid import UUID
+
+from solution import Pet, Visit
+
+FSYNC_POLICIES = ("always", "interval", "never")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class PetRegistered():
+    pet_id: UUID
+    name: str
+    species: str
+    owner_name: str
+
+
+@dataclass(frozen=True, slots=True)
+class VisitAdded():
+    pet_id: UUID
+    visit_id: UUID
+    date: datetime.date
+    reason: str
+    veterinarian_name: str
+
+
+def events_for(pet: Pet) -> list:
+    return [
+        PetRegistered(pet.id, pet.name, pet.species, pet.owner_name),
+        *(visit_added(pet, visit) for visit in pet.visits),
+    ]
+
+
+def visit_added(pet: Pet, visit: Visit) -> VisitAdded:
+    return VisitAdded(pet.id, visit.id, visit.date, visit.reason, visit.veterinarian_name)
+
+
+def encode(event, version: int) -> dict:
+    if isinstance(event, PetRegistered):
+        data = {"name": event.name, "species": event.species, "owner_name": event.owner_name}
+    else:
+        data = {
+            "visit_id": str(event.visit_id),
+            "date": event.date.isoformat(),
+            "reason": event.reason,
+            "veterinarian_name": event.veterinarian_name,
+        }
+    return {"a": str(event.pet_id), "v": version, "t": type(event).__name__, "d": data}
+
+
+def apply(pet: Pet | None, record: dict) -> Pet:
+    data = record["d"]
+    if record["t"] == "PetRegistered":
+        return Pet(UUID(record["a"]), data["name"], data["species"], data["owner_name"])
+    pet.visits.append(
+        Visit(UUID(data["visit_id"]), datetime.date.fromisoformat(data["date"]), data["reason"], data["veterinarian_name"])
+    )
+    return pet
+
+
+def snapshot_of(pet: Pet) -> dict:
+    return {
+        "id": str(pet.id),
+        "name": pet.name,
+        "species": pet.species,
+        "owner_name": pet.owner_name,
+        "visits": [[str(v.id), v.date.isoformat(), v.reason, v.veterinarian_name] for v in pet.visits],
+    }
+
+
+def read_records(path: Path, tail: bool):
+    """Yields (offset, record) for every line of a JSONL file.
+
+    In a file that is still appended to (`tail`), a last line without its newline or that is not valid
+    JSON is what a crash between fsyncs leaves behind: it is truncated away so the next append starts
+    on a clean line. Anywhere else a broken line is an error."""
+    torn = None
+    with open(path, "rb") as file:
+        offset = 0
+        for line in file:
+            try:
+                record = json.loads(line) if line.endswith(b"\n") else None
+            except ValueError:
+                if not tail or file.read(1):
+                    raise
+                record = None
+            if record is None:
+                if not tail:
+                    raise ValueError(f"{path}: record cut short at byte {offset}")
+                torn = offset
+                break
+            yield offset, record
+            offset += len(line)
+    if torn is not None:
+        logger.warning("%s: dropping a torn record at byte %d", path, torn)
+        os.truncate(path, torn)
+
+
+def pet_from_snapshot(state: dict) -> Pet:
+    pet = Pet(UUID(state["id"]), state["name"], state["species"], state["owner_name"])
+    pet.visits = [Visit(UUID(id), datetime.date.fromisoformat(date), reason, vet) for id, date, reason, vet in state["visits"]]
+    return pet
+
+
+class PetEventStore():
+    """Append-only event log for Pet stored as JSONL segments, with per-pet snapshots.
+
+    Opening the store scans the segments once to index the offset of every event, so loading a pet
+    reads its latest snapshot and seeks only to the events written after it. `compact()` drops the
+    events already covered by snapshots.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        fsync: str = "interval",
+        fsync_interval: float = 1.0,
+        max_segment_bytes: int = 64 * 2**20,
+        snapshot_every: int = 100,
+    ) -> None:
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.max_segment_bytes = max_segment_bytes
+        self.snapshot_every = snapshot_every
+        self.last_fsync = time.monotonic()
+        self.versions: dict[str, int] = {}
+        self.offsets: dict[str, list[tuple[int, int, int]]] = {}  # pet id -> [(segment, offset, version)]
+        self.snapshots: dict[str, tuple[int, dict]] = {}  # pet id -> (version, state)
+        self._open()
+
+    @property
+    def snapshots_path(self) -> Path:
+        return self.directory / "snapshots.jsonl"
+
+    def segment_path(self, number: int) -> Path:
+        return self.directory / f"segment-{number:06d}.jsonl"
+
+    def _segments(self) -> list[int]:
+        return sorted(int(path.stem.split("-")[1]) for path in self.directory.glob("segment-*.jsonl"))
+
+    def _open(self) -> None:
+        self.versions.clear()
+        self.offsets.clear()
+        self.snapshots.clear()
+        segments = self._segments()
+        for number in segments:
+            for offset, record in read_records(self.segment_path(number), tail=number == segments[-1]):
+                # A crash during compact() can leave a compacted copy next to the old segments:
+                # events already indexed for the pet are skipped
+                if record["v"] > self.versions.get(record["a"], 0):
+                    self.offsets.setdefault(record["a"], []).append((number, offset, record["v"]))
+                    self.versions[record["a"]] = record["v"]
+        if self.snapshots_path.exists():
+            for _, snapshot in read_records(self.snapshots_path, tail=True):
+                self.snapshots[snapshot["state"]["id"]] = (snapshot["v"], snapshot["state"])
+                self.versions.setdefault(snapshot["state"]["id"], snapshot["v"])
+        self.segment = segments[-1] if segments else 1
+        self.writer = open(self.segment_path(self.segment), "ab")
+
+    def append(self, events: list) -> None:
+        touched = set()
+        for event in events:
+            pet_id = str(event.pet_id)
+            version = self.versions.get(pet_id, 0) + 1
+            if self.writer.tell() >= self.max_segment_bytes:
+                self._roll()
+            offset = self.writer.tell()
+            self.writer.write(json.dumps(encode(event, version)).encode() + b"\n")
+            self.versions[pet_id] = version
+            self.offsets.setdefault(pet_id, []).append((self.segment, offset, version))
+            touched.add(pet_id)
+        self._flush(self.writer)
+        for pet_id in touched:
+            snapshot_version = self.snapshots.get(pet_id, (0, None))[0]
+            if self.versions[pet_id] - snapshot_version >= self.snapshot_every:
+                self.snapshot(self.load(UUID(pet_id)))
+
+    def register(self, pet: Pet) -> None:
+        """Records a new pet and keeps appending its visits as they are added."""
+        self.append(events_for(pet))
+        self.track(pet)
+
+    def track(self, pet: Pet) -> None:
+        pet.visit_listeners.append(lambda pet, visit: self.append([visit_added(pet, visit)]))
+
+    def load(self, id: UUID) -> Pet | None:
+        pet_id = str(id)
+        version, state = self.snapshots.get(pet_id, (0, None))
+        pet = pet_from_snapshot(state) if state else None
+        readers = {}
+        try:
+            for segment, offset, event_version in self.offsets.get(pet_id, ()):
+                if event_version <= version:
+                    continue
+                reader = readers.get(segment)
+                if reader is None:
+                    reader = readers[segment] = open(self.segment_path(segment), "rb")
+                reader.seek(offset)
+                pet = apply(pet, json.loads(reader.readline()))
+        finally:
+            for reader in readers.values():
+                reader.close()
+        return pet
+
+    def snapshot(self, pet: Pet) -> None:
+        pet_id = str(pet.id)
+        version, state = self.versions[pet_id], snapshot_of(pet)
+        with open(self.snapshots_path, "ab") as snapshots:
+            snapshots.write(json.dumps({"v": version, "state": state}).encode() + b"\n")
+            self._flush(snapshots, force=self.fsync != "never")
+        self.snapshots[pet_id] = (version, state)
+
+    def compact(self) -> None:
+        """Rewrites the log without the events covered by snapshots, and keeps only the latest snapshot per pet."""
+        self.writer.close()
+        old_segments = self._segments()
+        compacted = self.directory / "compacted.tmp"
+        written: dict[str, int] = {}  # pet id -> last version copied
+        with open(compacted, "wb") as output:
+            for number in old_segments:
+                with open(self.segment_path(number), "rb") as segment:
+                    for line in segment:
+                        record = json.loads(line)
+                        last = max(written.get(record["a"], 0), self.snapshots.get(record["a"], (0, None))[0])
+                        if record["v"] > last:
+                            output.write(line)
+                            written[record["a"]] = record["v"]
+            self._flush(output, force=True)
+        snapshots = self.directory / "snapshots.tmp"
+        with open(snapshots, "wb") as output:
+            for version, state in self.snapshots.values():
+                output.write(json.dumps({"v": version, "state": state}).encode() + b"\n")
+            self._flush(output, force=True)
+        os.replace(snapshots, self.snapshots_path)
+        os.replace(compacted, self.segment_path(old_segments[-1] + 1 if old_segments else 1))
+        for number in old_segments:
+            self.segment_path(number).unlink()
+        self._open()
+
+    def _roll(self) -> None:
+        self._flush(self.writer, force=self.fsync != "never")
+        self.writer.close()
+        self.segment += 1
+        self.writer = open(self.segment_path(self.segment), "ab")
+
+    def _flush(self, file, force: bool = False) -> None:
+        file.flush()
+        now = time.monotonic()
+        if force or self.fsync == "always" or (self.fsync == "interval" and now - self.last_fsync >= self.fsync_interval):
+            os.fsync(file.fileno())
+            self.last_fsync = now
+
+    def close(self) -> None:
+        self._flush(self.writer, force=self.fsync != "never")
+        self.writer.close()
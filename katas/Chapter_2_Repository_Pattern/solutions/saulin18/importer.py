@@ -0,0 +1,149 @@
+import csv
+import datetime
+import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+from uuid import UUID
+
+from abstract_pet_repository import AbstractPetRepository
+from solution import Pet, Visit, monotonic_ids
+
+PET_FIELDS = ("pet_id", "name", "species", "owner_name")
+VISIT_FIELDS = ("visit_date", "reason", "veterinarian_name")
+
+
+@dataclass
+class ImportReport():
+    """`rejected` keeps only the first rejected rows as examples; `rejected_count` counts all of them."""
+
+    rows: int = 0
+    pets: int = 0
+    visits: int = 0
+    rejected_count: int = 0
+    rejected: list[tuple[int, str]] = field(default_factory=list)  # (line number, reason)
+
+    def reject(self, number: int, reason: str, keep: int) -> None:
+        self.rejected_count += 1
+        if len(self.rejected) < keep:
+            self.rejected.append((number, reason))
+
+
+def read_records(path: str | Path) -> Iterator[tuple[int, dict]]:
+    """Yields (line number, record) from a .csv with a header row or from a .jsonl file."""
+    path = Path(path)
+    with open(path, newline="", encoding="utf-8") as file:
+        if path.suffix == ".jsonl":
+            for number, line in enumerate(file, 1):
+                if line.strip():
+                    try:
+                        yield number, json.loads(line)
+                    except json.JSONDecodeError as error:
+                        yield number, {"_error": f"invalid JSON: {error.msg}"}
+        else:
+            for number, row in enumerate(csv.DictReader(file), 2):
+                yield number, row
+
+
+def parse_record(record: dict) -> tuple | str:
+    """One row per visit (visit columns empty for pets without visits). Returns
+    ((pet_id, name, species, owner_name), (visit_date, reason, veterinarian_name) | None) or the rejection reason."""
+    if not isinstance(record, dict):
+        return f"not an object: {type(record).__name__}"
+    if "_error" in record:
+        return record["_error"]
+    values = {name: str(record.get(name) or "").strip() for name in PET_FIELDS + VISIT_FIELDS}
+    missing = [name for name in PET_FIELDS if not values[name]]
+    if missing:
+        return f"missing fields: {', '.join(missing)}"
+    try:
+        pet_id = UUID(values["pet_id"])
+    except ValueError:
+        return f"invalid pet_id: {values['pet_id']!r}"
+    pet = (pet_id, values["name"], values["species"], values["owner_name"])
+    if not values["visit_date"]:
+        return pet, None
+    try:
+        visit_date = datetime.date.fromisoformat(values["visit_date"])
+    except ValueError:
+        return f"invalid visit_date: {values['visit_date']!r}"
+    return pet, (visit_date, values["reason"], values["veterinarian_name"])
+
+
+def parse_chunk(chunk: list[tuple[int, dict]]) -> list[tuple[int, tuple | str]]:
+    return [(number, parse_record(record)) for number, record in chunk]
+
+
+def chunks(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def parse_stream(records: Iterable[tuple[int, dict]], workers: int = 0, chunk_size: int = 1_000):
+    """Parses in this process or, with `workers`, in a process pool keeping a bounded window of chunks in flight."""
+    if not workers:
+        for number, record in records:
+            yield number, parse_record(record)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        window = deque()
+        for chunk in chunks(records, chunk_size):
+            window.append(executor.submit(parse_chunk, chunk))
+            if len(window) >= 2 * workers:
+                yield from window.popleft().result()
+        while window:
+            yield from window.popleft().result()
+
+
+def import_pets(
+    path: str | Path,
+    repository: AbstractPetRepository,
+    batch_size: int = 10_000,
+    workers: int = 0,
+    max_rejected: int = 1_000,
+    on_rejected: Callable[[int, str], None] | None = None,
+) -> ImportReport:
+    """Streams a legacy export into the repository one batch of pets at a time, so memory stays bounded by
+    `batch_size` whatever the size of the export. Rows of a pet may be spread over the export: repeated
+    pet ids are merged into the pet of the current batch, and on flush the visits of pets the repository
+    already has (from an earlier batch or a previous import) are appended to the stored pet with
+    `save_changes`. Every rejected row is passed to `on_rejected`; the report keeps `max_rejected`."""
+    report = ImportReport()
+    new_visit_id = monotonic_ids()
+    batch: dict[UUID, Pet] = {}
+
+    def flush():
+        appended = []
+        for stored in repository.get_many(list(batch)):
+            start = len(stored.visits)
+            for visit in batch.pop(stored.id).visits:
+                stored.visits.append(visit)
+            appended.append((stored, start))
+        repository.save_changes(list(batch.values()), appended)
+        report.pets += len(batch)
+        report.visits += sum(len(pet.visits) for pet in batch.values())
+        report.visits += sum(len(pet.visits) - start for pet, start in appended)
+        batch.clear()
+
+    for number, parsed in parse_stream(read_records(path), workers):
+        report.rows += 1
+        if isinstance(parsed, str):
+            report.reject(number, parsed, max_rejected)
+            if on_rejected is not None:
+                on_rejected(number, parsed)
+            continue
+        (pet_id, name, species, owner_name), visit = parsed
+        pet = batch.get(pet_id)
+        if pet is None:
+            pet = batch[pet_id] = Pet(pet_id, name, species, owner_name)
+        if visit is not None:
+            pet.visits.append(Visit(new_visit_id(), *visit))
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return report
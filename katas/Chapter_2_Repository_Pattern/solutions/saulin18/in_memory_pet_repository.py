@@ -0,0 +1,82 @@
+import datetime
+from bisect import bisect_right, insort
+from uuid import UUID
+
+from abstract_pet_repository import AbstractPetRepository
+from solution import Pet, Visit
+
+
+class InMemoryPetRepositoryImpl(AbstractPetRepository):
+    def __init__(self):
+        self.pets = {}
+        self.sorted_ids = []
+        # Secondary indexes: value -> ids of the pets that have it
+        self.by_owner: dict[str, set[UUID]] = {}
+        self.by_species: dict[str, set[UUID]] = {}
+        self.by_visit_date: dict[datetime.date, set[UUID]] = {}
+        self.indexed: dict[UUID, tuple[str, str, set[datetime.date]]] = {}
+
+    def add(self, pet: Pet) -> None:
+        if pet.id not in self.pets:
+            insort(self.sorted_ids, pet.id)
+        self._unindex(pet.id)
+        self.pets[pet.id] = pet
+        self._index(pet)
+        if self._on_visit_added not in pet.visit_listeners:
+            pet.visit_listeners.append(self._on_visit_added)
+
+    def get(self, id: UUID) -> Pet:
+        return self.pets.get(id)
+
+    def visits_of(self, id: UUID) -> list[Visit]:
+        return list(self.pets[id].visits) if id in self.pets else []
+
+    def count_visits(self, id: UUID) -> int:
+        return len(self.pets[id].visits) if id in self.pets else 0
+
+    def recent_visits(self, id: UUID, limit: int) -> list[Visit]:
+        return self.pets[id].recent_visits(limit) if id in self.pets else []
+
+    def list_page(self, after_id: UUID | None = None, limit: int = 100) -> list[Pet]:
+        start = 0 if after_id is None else bisect_right(self.sorted_ids, after_id)
+        return [self.pets[id] for id in self.sorted_ids[start:start + limit]]
+
+    def find_by_owner(self, owner_name: str) -> list[Pet]:
+        return self._pets_with(self.by_owner.get(owner_name))
+
+    def find_by_species(self, species: str) -> list[Pet]:
+        return self._pets_with(self.by_species.get(species))
+
+    def find_by_visit_date(self, date: datetime.date) -> list[Pet]:
+        # Visits undone by a unit of work rollback can leave stale candidates, so they are re-checked
+        candidates = self._pets_with(self.by_visit_date.get(date))
+        return [pet for pet in candidates if any(visit.date == date for visit in pet.visits)]
+
+    def _pets_with(self, ids: set[UUID] | None) -> list[Pet]:
+        return [self.pets[id] for id in sorted(ids)] if ids else []
+
+    def list(self) -> list[Pet]:
+        return list(self.pets.values())
+
+    def _index(self, pet: Pet) -> None:
+        dates = {visit.date for visit in pet.visits}
+        self.indexed[pet.id] = (pet.owner_name, pet.species, dates)
+        self.by_owner.setdefault(pet.owner_name, set()).add(pet.id)
+        self.by_species.setdefault(pet.species, set()).add(pet.id)
+        for date in dates:
+            self.by_visit_date.setdefault(date, set()).add(pet.id)
+
+    def _unindex(self, id: UUID) -> None:
+        if id not in self.indexed:
+            return
+        owner_name, species, dates = self.indexed.pop(id)
+        self.by_owner[owner_name].discard(id)
+        self.by_species[species].discard(id)
+        for date in dates:
+            self.by_visit_date[date].discard(id)
+
+    def _on_visit_added(self, pet: Pet, visit: Visit) -> None:
+        if self.pets.get(pet.id) is not pet:
+            return
+        self.indexed[pet.id][2].add(visit.date)
+        self.by_visit_date.setdefault(visit.date, set()).add(pet.id)
@@ -1,26 +1,185 @@
 
 import datetime
+import itertools
+import secrets
+from dataclasses import dataclass
+from typing import Callable
 from uuid import UUID, uuid4
 
+
+def monotonic_ids() -> Callable[[], UUID]:
+    """Cheaper id generator than uuid4() for bulk loads: a random 64-bit prefix followed by a counter.
+    The ids are still UUIDs, so they round-trip through every repository."""
+    prefix = secrets.randbits(64) << 64
+    counter = itertools.count()
+    return lambda: UUID(int=prefix | next(counter))
+
+
+@dataclass(frozen=True, slots=True, init=False)
 class Visit():
+    """Pass an id (e.g. from `monotonic_ids()`) to skip the cost of uuid4() when building many visits.
+    Ids must be UUIDs, since every repository stores them as such; `None` generates one."""
+
     id: UUID
-    veterinarian_name: str
-    date: datetime
+    date: datetime.date
     reason: str
-    
-    def __init__(self, id: UUID = None, date: datetime.date = datetime.date.today(), reason: str = "", veterinarian_name: str = "") -> None:
-        self.id = id if id else uuid4()
-        self.date = date
-        self.reason = reason
-        self.veterinarian_name = veterinarian_name
-    
+    veterinarian_name: str
+
+    def __init__(
+        self, id: UUID | None = None, date: datetime.date | None = None, reason: str = "", veterinarian_name: str = ""
+    ) -> None:
+        if id is None:
+            id = uuid4()
+        elif not isinstance(id, UUID):
+            raise TypeError(f"Visit id must be a UUID, got {type(id).__name__}")
+        object.__setattr__(self, "id", id)
+        object.__setattr__(self, "date", date if date is not None else datetime.date.today())
+        object.__setattr__(self, "reason", reason)
+        object.__setattr__(self, "veterinarian_name", veterinarian_name)
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
+
+class VisitHistory():
+    """Columnar storage for large visit histories: one list per field instead of one object per visit.
+    Ids are generated lazily, only for the rows that get materialized as Visit."""
+
+    def __init__(self) -> None:
+        self.ids: list[UUID | None] = []
+        self.dates: list[datetime.date] = []
+        self.reasons: list[str] = []
+        self.veterinarian_names: list[str] = []
+
+    def append(self, date: datetime.date, reason: str = "", veterinarian_name: str = "", id: UUID = None) -> None:
+        self.ids.append(id)
+        self.dates.append(date)
+        self.reasons.append(reason)
+        self.veterinarian_names.append(veterinarian_name)
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __getitem__(self, index: int) -> Visit:
+        id = self.ids[index]
+        if id is None:
+            id = self.ids[index] = uuid4()
+        return Visit(id, self.dates[index], self.reasons[index], self.veterinarian_names[index])
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+
+class LazyVisits():
+    """Visit list of a stored pet that is read from its repository on first access.
+
+    `append`, `len` and slices past the stored visits (the unit of work and append paths) don't
+    load it, and `visits[-n:]` loads only the last n visits."""
+
+    def __init__(
+        self,
+        load: Callable[[], list[Visit]],
+        count: Callable[[], int],
+        load_recent: Callable[[int], list[Visit]],
+        source: object = None,
+    ) -> None:
+        self.load = load
+        self.count = count
+        self.load_recent = load_recent
+        self.source = source  # what the visits are loaded from, so a repository can recognize its own
+        self.visits: list[Visit] | None = None
+        self.appended: list[Visit] = []
+        self.stored: int | None = None
+
+    def unloaded_copy(self) -> "LazyVisits":
+        """New, not yet loaded list reading from the same source."""
+        return LazyVisits(self.load, self.count, self.load_recent, self.source)
+
+    @property
+    def loaded(self) -> bool:
+        return self.visits is not None
+
+    def stored_count(self) -> int:
+        if self.stored is None:
+            self.stored = self.count()
+        return self.stored
+
+    def _all(self) -> list[Visit]:
+        if self.visits is None:
+            self.visits = self.load() + self.appended
+            self.appended = []
+        return self.visits
+
+    def recent(self, limit: int) -> list[Visit]:
+        if limit <= 0:
+            return []
+        if self.visits is not None:
+            return self.visits[-limit:]
+        if limit <= len(self.appended):
+            return self.appended[len(self.appended) - limit:]
+        return self.load_recent(limit - len(self.appended)) + self.appended
+
+    def mark_stored(self) -> None:
+        """Called by the repository once the appended visits are written: they are loaded from it from now on."""
+        if self.visits is None:
+            self.stored = self.stored_count() + len(self.appended)
+            self.appended = []
+
+    def append(self, visit: Visit) -> None:
+        if self.visits is None:
+            self.appended.append(visit)
+        else:
+            self.visits.append(visit)
+
+    def _unloaded_tail(self, index) -> int | None:
+        """Start of `index` within `appended` when it is a slice `[start:]` that doesn't need the stored visits."""
+        if self.visits is not None or not isinstance(index, slice) or index.stop is not None or index.step is not None:
+            return None
+        start = index.start or 0
+        return start - self.stored_count() if start >= self.stored_count() else None
+
+    def __getitem__(self, index):
+        if self.visits is None and isinstance(index, slice) and index.start is not None and index.start < 0:
+            if index.stop is None and index.step is None:
+                return self.recent(-index.start)
+        start = self._unloaded_tail(index)
+        if start is not None:
+            return self.appended[start:]
+        return self._all()[index]
+
+    def __delitem__(self, index) -> None:
+        start = self._unloaded_tail(index)
+        if start is not None:
+            del self.appended[start:]
+        else:
+            del self._all()[index]
+
+    def __len__(self) -> int:
+        return len(self.visits) if self.visits is not None else self.stored_count() + len(self.appended)
+
+    def __iter__(self):
+        return iter(self._all())
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, (list, LazyVisits)):
+            return NotImplemented
+        return self._all() == list(other)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        if self.visits is not None:
+            return repr(self.visits)
+        return f"<LazyVisits: not loaded, {len(self.appended)} appended>"
+
 
 class Pet():
     id: UUID
     name: str
     species: str
     owner_name: str
-    visits: list[Visit]
+    visits: list[Visit] | LazyVisits
     
     def __init__(self, id: UUID = None, name: str = "", species: str = "", owner_name: str = "") -> None:
         self.id = id if id else uuid4()
@@ -28,9 +187,21 @@ class Pet():
         self.species = species
         self.owner_name = owner_name
         self.visits = []
+        self.visit_listeners: list[Callable[["Pet", Visit], None]] = []
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Pet) and other.id == self.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
         
+    def recent_visits(self, limit: int) -> list[Visit]:
+        return self.visits[-limit:] if limit > 0 else []
+
     def add_visit(self, visit: Visit) -> None:
         self.visits.append(visit)
+        for listener in self.visit_listeners:
+            listener(self, visit)
         
         
         
\ No newline at end of file
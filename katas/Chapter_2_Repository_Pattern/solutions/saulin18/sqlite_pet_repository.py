@@ -0,0 +1,209 @@
+import datetime
+import sqlite3
+from typing import Iterable
+from uuid import UUID
+
+from abstract_pet_repository import AbstractPetRepository
+from solution import LazyVisits, Pet, Visit
+
+# SQLite limits the number of "?" parameters per statement, so IN (...) queries are chunked
+MAX_PARAMETERS = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pets (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    species TEXT NOT NULL,
+    owner_name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS visits (
+    id TEXT PRIMARY KEY,
+    pet_id TEXT NOT NULL REFERENCES pets (id),
+    position INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    veterinarian_name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS visits_pet_id ON visits (pet_id, position);
+CREATE INDEX IF NOT EXISTS visits_date ON visits (date, pet_id);
+CREATE INDEX IF NOT EXISTS pets_owner_name ON pets (owner_name, id);
+CREATE INDEX IF NOT EXISTS pets_species ON pets (species, id);
+"""
+
+INSERT_PET = "INSERT OR REPLACE INTO pets (id, name, species, owner_name) VALUES (?, ?, ?, ?)"
+UPDATE_PET = "UPDATE pets SET name = ?, species = ?, owner_name = ? WHERE id = ?"
+DELETE_VISITS = "DELETE FROM visits WHERE pet_id = ?"
+SELECT_VISITS = "SELECT id, date, reason, veterinarian_name FROM visits WHERE pet_id = ?"
+INSERT_VISIT = (
+    "INSERT INTO visits (id, pet_id, position, date, reason, veterinarian_name) VALUES (?, ?, ?, ?, ?, ?)"
+)
+
+
+def chunked(items: list, size: int = MAX_PARAMETERS):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def visit_from_row(row: tuple) -> Visit:
+    id, date, reason, veterinarian_name = row
+    return Visit(UUID(id), datetime.date.fromisoformat(date), reason, veterinarian_name)
+
+
+class SqlitePetRepository(AbstractPetRepository):
+    """With `lazy_visits`, pets are returned with only their header and their visits are read on first
+    access (from the thread that opened the connection)."""
+
+    def __init__(self, path: str = ":memory:", lazy_visits: bool = False) -> None:
+        self.lazy_visits = lazy_visits
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def add(self, pet: Pet) -> None:
+        self.add_many([pet])
+
+    def add_many(self, pets: Iterable[Pet]) -> None:
+        with self.connection:
+            self._write_pets(list(pets))
+
+    def add_visits(self, appended: Iterable[tuple[Pet, int]]) -> None:
+        with self.connection:
+            self._write_visits(appended)
+
+    def update_many(self, pets: Iterable[Pet]) -> None:
+        with self.connection:
+            self._update_pets(pets)
+
+    def save_changes(
+        self, new_pets: list[Pet], appended: list[tuple[Pet, int]], updated: list[Pet] = ()
+    ) -> None:
+        with self.connection:
+            self._write_pets(new_pets)
+            self._update_pets(updated)
+            self._write_visits(appended)
+
+    def _update_pets(self, pets: Iterable[Pet]) -> None:
+        # Only the header row: the stored visits stay as they are
+        self.connection.executemany(
+            UPDATE_PET, [(pet.name, pet.species, pet.owner_name, str(pet.id)) for pet in pets]
+        )
+
+    def _write_pets(self, pets: list[Pet]) -> None:
+        self.connection.executemany(INSERT_PET, [(str(pet.id), pet.name, pet.species, pet.owner_name) for pet in pets])
+        # Unloaded lazy visits of this repository are still stored: only the appended ones are written
+        unchanged = [pet for pet in pets if self._is_unloaded(pet.visits)]
+        rewritten = [pet for pet in pets if not self._is_unloaded(pet.visits)]
+        # The rest are rewritten as a whole so removed or reordered visits are persisted too. Rows are
+        # built before deleting, since building them may load lazy visits from this same table.
+        rows = self._visit_rows(
+            [(pet, 0) for pet in rewritten] + [(pet, pet.visits.stored_count()) for pet in unchanged]
+        )
+        self.connection.executemany(DELETE_VISITS, [(str(pet.id),) for pet in rewritten])
+        self.connection.executemany(INSERT_VISIT, rows)
+        self._mark_stored(unchanged)
+
+    def _is_unloaded(self, visits) -> bool:
+        return isinstance(visits, LazyVisits) and visits.source is self and not visits.loaded
+
+    def _write_visits(self, appended: Iterable[tuple[Pet, int]]) -> None:
+        appended = list(appended)
+        self.connection.executemany(INSERT_VISIT, self._visit_rows(appended))
+        self._mark_stored(pet for pet, _ in appended)
+
+    def _mark_stored(self, pets: Iterable[Pet]) -> None:
+        for pet in pets:
+            if self._is_unloaded(pet.visits):
+                pet.visits.mark_stored()
+
+    @staticmethod
+    def _visit_rows(appended: Iterable[tuple[Pet, int]]) -> list[tuple]:
+        return [
+            (str(visit.id), str(pet.id), position, visit.date.isoformat(), visit.reason, visit.veterinarian_name)
+            for pet, start in appended
+            for position, visit in enumerate(pet.visits[start:], start)
+        ]
+
+    def get(self, id: UUID) -> Pet:
+        pets = self.get_many([id])
+        return pets[0] if pets else None
+
+    def get_many(self, ids: Iterable[UUID]) -> list[Pet]:
+        keys = [str(id) for id in ids]
+        pets = {}
+        for chunk in chunked(keys):
+            placeholders = ", ".join("?" * len(chunk))
+            rows = self.connection.execute(
+                f"SELECT id, name, species, owner_name FROM pets WHERE id IN ({placeholders})", chunk
+            )
+            pets.update(self._load(rows))
+        return [pets[key] for key in keys if key in pets]
+
+    def visits_of(self, id: UUID) -> list[Visit]:
+        rows = self.connection.execute(SELECT_VISITS + " ORDER BY position", (str(id),))
+        return [visit_from_row(row) for row in rows]
+
+    def count_visits(self, id: UUID) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM visits WHERE pet_id = ?", (str(id),)).fetchone()[0]
+
+    def recent_visits(self, id: UUID, limit: int) -> list[Visit]:
+        if limit <= 0:
+            return []
+        rows = self.connection.execute(SELECT_VISITS + " ORDER BY position DESC LIMIT ?", (str(id), limit)).fetchall()
+        return [visit_from_row(row) for row in reversed(rows)]
+
+    def list_page(self, after_id: UUID | None = None, limit: int = 100) -> list[Pet]:
+        if after_id is None:
+            rows = self.connection.execute(
+                "SELECT id, name, species, owner_name FROM pets ORDER BY id LIMIT ?", (limit,)
+            )
+        else:
+            rows = self.connection.execute(
+                "SELECT id, name, species, owner_name FROM pets WHERE id > ? ORDER BY id LIMIT ?",
+                (str(after_id), limit),
+            )
+        return list(self._load(rows).values())
+
+    def find_by_owner(self, owner_name: str) -> list[Pet]:
+        return self._find("owner_name = ?", owner_name)
+
+    def find_by_species(self, species: str) -> list[Pet]:
+        return self._find("species = ?", species)
+
+    def find_by_visit_date(self, date: datetime.date) -> list[Pet]:
+        return self._find("id IN (SELECT pet_id FROM visits WHERE date = ?)", date.isoformat())
+
+    def _find(self, condition: str, value: str) -> list[Pet]:
+        rows = self.connection.execute(
+            f"SELECT id, name, species, owner_name FROM pets WHERE {condition} ORDER BY id", (value,)
+        )
+        return list(self._load(rows).values())
+
+    def list(self) -> list[Pet]:
+        return list(self._load(self.connection.execute("SELECT id, name, species, owner_name FROM pets")).values())
+
+    def _load(self, rows: Iterable[tuple]) -> dict[str, Pet]:
+        pets = {row[0]: Pet(UUID(row[0]), row[1], row[2], row[3]) for row in rows}
+        if self.lazy_visits:
+            for pet in pets.values():
+                pet.visits = LazyVisits(
+                    lambda id=pet.id: self.visits_of(id),
+                    lambda id=pet.id: self.count_visits(id),
+                    lambda limit, id=pet.id: self.recent_visits(id, limit),
+                    source=self,
+                )
+            return pets
+        # All visits of the page are fetched with one query per chunk instead of one query per pet
+        for chunk in chunked(list(pets)):
+            placeholders = ", ".join("?" * len(chunk))
+            visits = self.connection.execute(
+                f"SELECT id, pet_id, date, reason, veterinarian_name FROM visits "
+                f"WHERE pet_id IN ({placeholders}) ORDER BY pet_id, position",
+                chunk,
+            )
+            for visit_id, pet_id, *visit in visits:
+                pets[pet_id].visits.append(visit_from_row((visit_id, *visit)))
+        return pets
+
+    def close(self) -> None:
+        self.connection.close()
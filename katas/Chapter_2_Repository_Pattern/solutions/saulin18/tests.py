@@ -1,40 +1,455 @@
 
-from solution import Pet, Visit
+from solution import LazyVisits, Pet, Visit, VisitHistory, monotonic_ids
+import asyncio
+import json
 import pytest
+from datetime import date
 from uuid import UUID
 from abstract_pet_repository import AbstractPetRepository
+from in_memory_pet_repository import InMemoryPetRepositoryImpl
+from sqlite_pet_repository import SqlitePetRepository
+from async_pet_repository import AsyncPetRepository
+from cached_pet_repository import CachedPetRepository, PetCache
+from unit_of_work import PetUnitOfWork
+from event_store import PetEventStore, visit_added
+from importer import import_pets
+
+
+def cached_sqlite_repository() -> AbstractPetRepository:
+    return CachedPetRepository(SqlitePetRepository())
+
+
+def lazy_sqlite_repository() -> AbstractPetRepository:
+    return SqlitePetRepository(lazy_visits=True)
+
+
+@pytest.fixture(
+    params=[InMemoryPetRepositoryImpl, SqlitePetRepository, cached_sqlite_repository, lazy_sqlite_repository]
+)
+def pet_repository(request) -> AbstractPetRepository:
+    return request.param()
 
-class InMemoryPetRepositoryImpl(AbstractPetRepository):
-    def __init__(self):
-        self.pets = {}
-    
-    def add(self, pet: Pet) -> None:
-        self.pets[pet.id] = pet
-    
-    def get(self, id: UUID) -> Pet:
-        return self.pets.get(id)
-    
-    def list(self) -> list[Pet]:
-        return list(self.pets.values())
-
-@pytest.fixture
-def pet_repository() -> AbstractPetRepository:
-    return InMemoryPetRepositoryImpl()
 
 def test_add_and_get_pet(pet_repository: AbstractPetRepository):
     pet = Pet(name="Fido", species="Dog", owner_name="John Doe")
     pet_repository.add(pet)
     assert pet_repository.get(pet.id) == pet
 
+
 def test_list_pets(pet_repository: AbstractPetRepository):
     pet = Pet(name="Fido", species="Dog", owner_name="John Doe")
     pet_repository.add(pet)
     assert pet_repository.list() == [pet]
-    
+
+
 def test_add_visit_to_pet(pet_repository: AbstractPetRepository):
     pet = Pet(name="Fido", species="Dog", owner_name="John Doe")
     visit = Visit(reason="Checkup", veterinarian_name="Dr. Smith")
     pet.add_visit(visit)
     pet_repository.add(pet)
     assert pet.visits == [visit]
-    assert pet_repository.get(pet.id).visits == [visit]
\ No newline at end of file
+    assert pet_repository.get(pet.id).visits == [visit]
+
+
+def test_visit_history_materializes_visits_with_stable_ids():
+    history = VisitHistory()
+    history.append(date(2025, 10, 18), "Checkup", "Dr. Smith")
+    first = history[0]
+    assert first == history[0]
+    assert list(history) == [Visit(first.id, date(2025, 10, 18), "Checkup", "Dr. Smith")]
+
+
+def test_visit_ids_default_to_uuid4_and_monotonic_ids_are_unique_uuids():
+    assert isinstance(Visit().id, UUID) and Visit().id != Visit().id
+    new_id = monotonic_ids()
+    ids = [new_id() for _ in range(3)]
+    assert all(isinstance(id, UUID) for id in ids) and ids == sorted(set(ids))
+    assert Visit(ids[0]).id == ids[0]
+    assert isinstance(Visit(id=None).id, UUID)
+    with pytest.raises(TypeError):
+        Visit(7, date(2025, 10, 18))
+
+
+def test_add_many_and_get_many(pet_repository: AbstractPetRepository):
+    pets = [Pet(name=f"Pet {i}", species="Cat", owner_name="Jane Doe") for i in range(3)]
+    pets[1].add_visit(Visit(date=date(2025, 10, 18), reason="Vaccine", veterinarian_name="Dr. Smith"))
+    pet_repository.add_many(pets)
+
+    found = pet_repository.get_many([pets[2].id, pets[1].id, UUID(int=0)])
+
+    assert found == [pets[2], pets[1]]
+    assert found[1].visits == pets[1].visits
+
+
+def test_sqlite_repository_persists_between_connections(tmp_path):
+    path = str(tmp_path / "pets.db")
+    pet = Pet(name="Fido", species="Dog", owner_name="John Doe")
+    pet.add_visit(Visit(date=date(2025, 10, 18), reason="Checkup", veterinarian_name="Dr. Smith"))
+    repository = SqlitePetRepository(path)
+    repository.add(pet)
+    repository.close()
+
+    loaded = SqlitePetRepository(path).get(pet.id)
+
+    assert (loaded.name, loaded.species, loaded.owner_name) == ("Fido", "Dog", "John Doe")
+    assert loaded.visits == pet.visits
+
+
+def test_list_page_uses_keyset_pagination(pet_repository: AbstractPetRepository):
+    pets = [Pet(name=f"Pet {i}", species="Dog", owner_name="John Doe") for i in range(5)]
+    pet_repository.add_many(pets)
+    ordered = sorted(pets, key=lambda pet: pet.id)
+
+    first_page = pet_repository.list_page(limit=2)
+    second_page = pet_repository.list_page(first_page[-1].id, limit=2)
+
+    assert first_page + second_page == ordered[:4]
+    assert pet_repository.list_page(ordered[-1].id) == []
+
+
+def test_iter_all_streams_every_pet_in_batches(pet_repository: AbstractPetRepository):
+    pets = [Pet(name=f"Pet {i}", species="Dog", owner_name="John Doe") for i in range(7)]
+    pet_repository.add_many(pets)
+
+    assert list(pet_repository.iter_all(batch_size=3)) == sorted(pets, key=lambda pet: pet.id)
+
+
+def test_secondary_queries_match_a_full_scan(pet_repository: AbstractPetRepository):
+    pets = [
+        Pet(name="Fido", species="Dog", owner_name="John Doe"),
+        Pet(name="Luna", species="Cat", owner_name="John Doe"),
+        Pet(name="Rex", species="Dog", owner_name="Jane Roe"),
+    ]
+    pets[2].add_visit(Visit(date=date(2025, 10, 18), reason="Checkup", veterinarian_name="Dr. Smith"))
+    pet_repository.add_many(pets)
+    pets[0].add_visit(Visit(date=date(2025, 10, 18), reason="Vaccine", veterinarian_name="Dr. Smith"))
+    pet_repository.add(pets[0])
+    scan = AbstractPetRepository
+
+    for query, value in [
+        ("find_by_owner", "John Doe"),
+        ("find_by_species", "Dog"),
+        ("find_by_visit_date", date(2025, 10, 18)),
+        ("find_by_owner", "Nobody"),
+    ]:
+        assert getattr(pet_repository, query)(value) == getattr(scan, query)(pet_repository, value)
+    assert pet_repository.find_by_visit_date(date(2025, 10, 18)) == sorted([pets[0], pets[2]], key=lambda pet: pet.id)
+
+
+def test_in_memory_indexes_follow_add_visit_and_re_add():
+    pet_repository = InMemoryPetRepositoryImpl()
+    pet = Pet(name="Fido", species="Dog", owner_name="John Doe")
+    pet_repository.add(pet)
+
+    pet.add_visit(Visit(date=date(2025, 10, 18), reason="Checkup", veterinarian_name="Dr. Smith"))
+    pet.owner_name = "Jane Roe"
+    pet_repository.add(pet)
+
+    assert pet_repository.find_by_visit_date(date(2025, 10, 18)) == [pet]
+    assert pet_repository.find_by_owner("John Doe") == []
+    assert pet_repository.find_by_owner("Jane Roe") == [pet]
+
+
+def test_cached_repository_returns_one_instance_per_unit_of_work():
+    backend = SqlitePetRepository()
+    pet = Pet(name="Fido", species="Dog", owner_name="John Doe")
+    backend.add(pet)
+    cache = PetCache()
+
+    first_unit = CachedPetRepository(backend, cache)
+    assert first_unit.get(pet.id) is first_unit.get(pet.id)
+    assert first_unit.find_by_owner("John Doe")[0] is first_unit.get(pet.id)
+    CachedPetRepository(backend, cache).get(pet.id)
+
+    assert cache.stats() == {"hits": 1, "misses": 1, "evictions": 0, "size": 1}
+
+
+@pytest.mark.parametrize("lazy_visits", [False, True])
+def test_units_of_work_sharing_a_cache_get_distinct_instances(lazy_visits):
+    backend = SqlitePetRepository(lazy_visits=lazy_visits)
+    pet = Pet(name="Fido", species="Dog", owner_name="John Doe")
+    pet.add_visit(Visit(date=date(2025, 1, 1), reason="Checkup"))
+    backend.add(pet)
+    cache = PetCache()
+
+    first = CachedPetRepository(backend, cache).get(pet.id)
+    second = CachedPetRepository(backend, cache).get(pet.id)
+    first.add_visit(Visit(date=date(2025, 2, 1), reason="Vaccine"))
+    first.name = "Rex"
+
+    assert first is not second
+    assert (second.name, [visit.reason for visit in second.visits]) == ("Fido", ["Checkup"])
+    assert cache.stats()["hits"] == 1
+
+
+def test_pet_cache_evicts_least_recently_used_and_expired_entries():
+    now = [0.0]
+    cache = PetCache(max_size=2, ttl=10, clock=lambda: now[0])
+    pets = [Pet(name=f"Pet {i}") for i in range(3)]
+    cache.put(pets[0])
+    cache.put(pets[1])
+    cache.get(pets[0].id)
+    cache.put(pets[2])
+
+    assert cache.get(pets[1].id) is None
+    now[0] = 11
+    assert cache.get(pets[0].id) is None
+    assert cache.evictions == 2
+
+
+def test_add_invalidates_the_shared_cache():
+    backend = SqlitePetRepository()
+    pet = Pet(name="Fido", species="Dog", owner_name="John Doe")
+    backend.add(pet)
+    cache = PetCache()
+    CachedPetRepository(backend, cache).get(pet.id)
+
+    renamed = Pet(pet.id, name="Rex", species="Dog", owner_name="John Doe")
+    CachedPetRepository(backend, cache).add(renamed)
+
+    assert CachedPetRepository(backend, cache).get(pet.id).name == "Rex"
+
+
+@pytest.mark.parametrize("factory", [InMemoryPetRepositoryImpl, SqlitePetRepository])
+def test_async_repository_runs_the_backend_off_the_event_loop(factory):
+    pets = [Pet(name=f"Pet {i}", species="Dog", owner_name="John Doe") for i in range(4)]
+
+    async def scenario():
+        repository = AsyncPetRepository(factory)
+        await asyncio.gather(*(repository.add(pet) for pet in pets))
+        found = await repository.get(pets[0].id)
+        streamed = [pet async for pet in repository.iter_all(batch_size=3)]
+        repository.close()
+        return found, streamed
+
+    found, streamed = asyncio.run(scenario())
+
+    assert found == pets[0]
+    assert streamed == sorted(pets, key=lambda pet: pet.id)
+
+
+def test_unit_of_work_writes_nothing_until_commit(pet_repository: AbstractPetRepository):
+    stored = Pet(name="Fido", species="Dog", owner_name="John Doe")
+    pet_repository.add(stored)
+    new_pet = Pet(name="Luna", species="Cat", owner_name="Jane Roe")
+    visit = Visit(date=date(2025, 10, 18), reason="Checkup", veterinarian_name="Dr. Smith")
+
+    with PetUnitOfWork(pet_repository) as uow:
+        uow.pets.add(new_pet)
+        uow.pets.get(stored.id).add_visit(visit)
+        assert pet_repository.get(new_pet.id) is None
+        uow.commit()
+
+    assert pet_repository.get(new_pet.id) == new_pet
+    assert pet_repository.get(stored.id).visits == [visit]
+
+
+def test_unit_of_work_rollback_discards_new_pets_and_visits(pet_repository: AbstractPetRepository):
+    stored = Pet(name="Fido", species="Dog", owner_name="John Doe")
+    pet_repository.add(stored)
+    new_pet = Pet(name="Luna", species="Cat", owner_name="Jane Roe")
+
+    with PetUnitOfWork(pet_repository) as uow:
+        uow.pets.add(new_pet)
+        uow.pets.get(stored.id).add_visit(Visit(date=date(2025, 10, 18), reason="Checkup"))
+
+    assert pet_repository.get(new_pet.id) is None
+    assert pet_repository.get(stored.id).visits == []
+    assert pet_repository.find_by_visit_date(date(2025, 10, 18)) == []
+
+
+def test_unit_of_work_writes_changed_headers_of_loaded_pets(pet_repository: AbstractPetRepository):
+    stored = Pet(name="Fido", species="Dog", owner_name="John Doe")
+    visit = Visit(date=date(2025, 10, 18), reason="Checkup", veterinarian_name="Dr. Smith")
+    stored.add_visit(visit)
+    pet_repository.add(stored)
+
+    with PetUnitOfWork(pet_repository) as uow:
+        uow.pets.get(stored.id).owner_name = "Jane Roe"
+        uow.commit()
+    with PetUnitOfWork(pet_repository) as uow:
+        uow.pets.get(stored.id).name = "Rex"
+
+    pet = pet_repository.get(stored.id)
+    assert (pet.name, pet.owner_name) == ("Fido", "Jane Roe")
+    assert pet.visits == [visit]
+    assert pet_repository.find_by_owner("Jane Roe") == [stored]
+    assert pet_repository.find_by_owner("John Doe") == []
+
+
+def test_event_store_rebuilds_pets_from_snapshot_and_tail(tmp_path):
+    store = PetEventStore(tmp_path, fsync="always", snapshot_every=3, max_segment_bytes=300)
+    pet = Pet(name="Fido", species="Dog", owner_name="John Doe")
+    store.register(pet)
+    for day in range(1, 7):
+        pet.add_visit(Visit(date=date(2025, 10, day), reason="Checkup", veterinarian_name="Dr. Smith"))
+    store.close()
+
+    reopened = PetEventStore(tmp_path, snapshot_every=3)
+    loaded = reopened.load(pet.id)
+
+    assert reopened.snapshots[str(pet.id)][0] == 6
+    assert len(list(tmp_path.glob("segment-*.jsonl"))) > 1
+    assert (loaded.name, loaded.owner_name, loaded.visits) == ("Fido", "John Doe", pet.visits)
+
+
+def test_event_store_compaction_keeps_loads_identical(tmp_path):
+    store = PetEventStore(tmp_path, snapshot_every=4)
+    pets = [Pet(name=f"Pet {i}", species="Cat", owner_name="Jane Roe") for i in range(3)]
+    for pet in pets:
+        store.register(pet)
+        for day in range(1, 6):
+            pet.add_visit(Visit(date=date(2025, 10, day), reason="Checkup", veterinarian_name="Dr. Smith"))
+    size_before = sum(path.stat().st_size for path in tmp_path.glob("segment-*.jsonl"))
+
+    store.compact()
+    pets[0].add_visit(Visit(date=date(2025, 10, 6), reason="Vaccine", veterinarian_name="Dr. Smith"))
+
+    assert sum(path.stat().st_size for path in tmp_path.glob("segment-*.jsonl")) < size_before
+    assert [PetEventStore(tmp_path).load(pet.id).visits for pet in pets] == [pet.visits for pet in pets]
+
+
+def test_event_store_ignores_old_segments_left_by_an_interrupted_compaction(tmp_path):
+    store = PetEventStore(tmp_path, snapshot_every=4)
+    pets = [Pet(name=f"Pet {i}", species="Cat", owner_name="Jane Roe") for i in range(2)]
+    for pet in pets:
+        store.register(pet)
+        for day in range(1, 6):
+            pet.add_visit(Visit(date=date(2025, 10, day), reason="Checkup", veterinarian_name="Dr. Smith"))
+    old_segments = {path.name: path.read_bytes() for path in tmp_path.glob("segment-*.jsonl")}
+
+    store.compact()
+    store.close()
+    # Crash after publishing the compacted segment and before unlinking the old ones
+    for name, content in old_segments.items():
+        (tmp_path / name).write_bytes(content)
+
+    reopened = PetEventStore(tmp_path)
+    assert [reopened.load(pet.id).visits for pet in pets] == [pet.visits for pet in pets]
+    reopened.compact()
+    reopened.close()
+    assert [PetEventStore(tmp_path).load(pet.id).visits for pet in pets] == [pet.visits for pet in pets]
+
+
+@pytest.mark.parametrize("torn", [b'{"a": "xx", "v"', b'{"a": "xx", "v": 1}'])
+def test_event_store_truncates_a_torn_last_record(tmp_path, torn):
+    store = PetEventStore(tmp_path, fsync="never")
+    pet = Pet(name="Fido", species="Dog", owner_name="John Doe")
+    store.register(pet)
+    store.close()
+    (segment,) = tmp_path.glob("segment-*.jsonl")
+    size = segment.stat().st_size
+    with open(segment, "ab") as file:
+        file.write(torn)
+
+    reopened = PetEventStore(tmp_path)
+    assert segment.stat().st_size == size
+    visit = Visit(date=date(2025, 10, 18), reason="Checkup", veterinarian_name="Dr. Smith")
+    reopened.append([visit_added(pet, visit)])
+    reopened.close()
+    assert PetEventStore(tmp_path).load(pet.id).visits == [visit]
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_import_pets_streams_batches_and_reports_rejected_rows(tmp_path, workers):
+    fido, luna = UUID(int=1), UUID(int=2)
+    path = tmp_path / "pets.csv"
+    path.write_text(
+        "pet_id,name,species,owner_name,visit_date,reason,veterinarian_name\n"
+        f"{fido},Fido,Dog,John Doe,2025-10-18,Checkup,Dr. Smith\n"
+        f"{fido},Fido,Dog,John Doe,2025-10-19,Vaccine,Dr. Smith\n"
+        f"{fido},Fido,Dog,John Doe,19/10/2025,Vaccine,Dr. Smith\n"
+        "not-a-uuid,Rex,Dog,Jane Roe,,,\n"
+        f"{luna},Luna,Cat,Jane Roe,,,\n",
+        encoding="utf-8",
+    )
+    repository = SqlitePetRepository()
+    rejected = []
+
+    report = import_pets(
+        path, repository, batch_size=1, workers=workers, max_rejected=1, on_rejected=lambda *row: rejected.append(row)
+    )
+
+    assert (report.rows, report.pets, report.visits, report.rejected_count) == (5, 2, 2, 2)
+    assert [number for number, _ in report.rejected] == [4]
+    assert [number for number, _ in rejected] == [4, 5]
+    assert [visit.reason for visit in repository.get(fido).visits] == ["Checkup", "Vaccine"]
+    assert repository.get(luna).visits == []
+
+
+@pytest.mark.parametrize("batch_size", [1, 10])
+def test_import_pets_merges_rows_of_a_pet_spread_over_the_export(tmp_path, pet_repository, batch_size):
+    fido, luna = UUID(int=1), UUID(int=2)
+    path = tmp_path / "pets.csv"
+    path.write_text(
+        "pet_id,name,species,owner_name,visit_date,reason,veterinarian_name\n"
+        f"{fido},Fido,Dog,John Doe,2025-10-18,Checkup,Dr. Smith\n"
+        f"{luna},Luna,Cat,Jane Roe,2025-10-18,Checkup,Dr. Smith\n"
+        f"{fido},Fido,Dog,John Doe,2025-10-19,Vaccine,Dr. Smith\n",
+        encoding="utf-8",
+    )
+
+    stored = Pet(luna, "Luna", "Cat", "Jane Roe")
+    stored.add_visit(Visit(date=date(2025, 10, 1), reason="Vaccine", veterinarian_name="Dr. Smith"))
+    pet_repository.add(stored)
+
+    report = import_pets(path, pet_repository, batch_size=batch_size)
+
+    assert (report.rows, report.pets, report.visits, report.rejected) == (3, 1, 3, [])
+    assert [visit.reason for visit in pet_repository.get(fido).visits] == ["Checkup", "Vaccine"]
+    assert [visit.reason for visit in pet_repository.get(luna).visits] == ["Vaccine", "Checkup"]
+    assert len(pet_repository.list()) == 2
+
+
+def test_import_pets_rejects_jsonl_lines_that_are_not_objects(tmp_path):
+    fido = UUID(int=1)
+    path = tmp_path / "pets.jsonl"
+    row = {"pet_id": str(fido), "name": 5, "species": "Dog", "owner_name": "John Doe", "visit_date": None}
+    path.write_text("\n".join([json.dumps(row), "[1]", "42"]), encoding="utf-8")
+    repository = SqlitePetRepository()
+
+    report = import_pets(path, repository)
+
+    assert (report.rows, report.pets, [number for number, _ in report.rejected]) == (3, 1, [2, 3])
+    assert repository.get(fido).name == "5"
+
+
+def test_lazy_visits_load_on_first_access_and_append_without_loading():
+    repository = SqlitePetRepository(lazy_visits=True)
+    pet = Pet(name="Fido", species="Dog", owner_name="John Doe")
+    visits = [Visit(date=date(2025, 1, day), reason=f"Visit {day}") for day in range(1, 6)]
+    for visit in visits:
+        pet.add_visit(visit)
+    repository.add(pet)
+
+    loaded = repository.get(pet.id)
+    assert isinstance(loaded.visits, LazyVisits) and loaded.name == "Fido"
+    assert loaded.recent_visits(2) == visits[-2:]
+    new_visit = Visit(date=date(2025, 2, 1), reason="Vaccine")
+    loaded.add_visit(new_visit)
+    assert len(loaded.visits) == 6
+    repository.add(loaded)
+    repository.add(loaded)
+    assert not loaded.visits.loaded
+
+    assert list(loaded.visits) == [*visits, new_visit]
+    assert repository.get(pet.id).visits == [*visits, new_visit]
+    assert repository.recent_visits(pet.id, 3) == [*visits[-2:], new_visit]
+
+
+def test_unit_of_work_appends_to_lazy_visits_without_loading_them():
+    repository = SqlitePetRepository(lazy_visits=True)
+    pet = Pet(name="Fido", species="Dog", owner_name="John Doe")
+    pet.add_visit(Visit(date=date(2025, 1, 1), reason="Checkup"))
+    repository.add(pet)
+
+    with PetUnitOfWork(repository) as uow:
+        stored = uow.pets.get(pet.id)
+        stored.add_visit(Visit(date=date(2025, 2, 1), reason="Vaccine"))
+        uow.commit()
+    assert not stored.visits.loaded
+
+    with PetUnitOfWork(repository) as uow:
+        uow.pets.get(pet.id).add_visit(Visit(date=date(2025, 3, 1), reason="Discarded"))
+
+    assert [visit.reason for visit in repository.get(pet.id).visits] == ["Checkup", "Vaccine"]
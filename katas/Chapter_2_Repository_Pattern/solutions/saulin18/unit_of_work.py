@@ -0,0 +1,125 @@
+import datetime
+from abc import ABC, abstractmethod
+from typing import Iterable
+from uuid import UUID
+
+from abstract_pet_repository import AbstractPetRepository
+from solution import Pet, Visit
+
+
+def header(pet: Pet) -> tuple[str, str, str]:
+    return (pet.name, pet.species, pet.owner_name)
+
+
+class TrackingPetRepository(AbstractPetRepository):
+    """Repository view of a unit of work: nothing is written until commit.
+
+    `add` only registers the pet as new, and every pet it returns is watched so visits appended
+    with `Pet.add_visit` are recorded as (pet, index of its first new visit). The header of each
+    loaded pet is kept too, so pets whose name, species or owner changed are written on flush."""
+
+    def __init__(self, repository: AbstractPetRepository) -> None:
+        self.repository = repository
+        self.new: dict[UUID, Pet] = {}
+        self.appended: dict[UUID, tuple[Pet, int]] = {}
+        self.seen: dict[UUID, Pet] = {}
+        self.headers: dict[UUID, tuple[str, str, str]] = {}
+
+    def add(self, pet: Pet) -> None:
+        self.appended.pop(pet.id, None)
+        self.new[pet.id] = pet
+        self._track([pet])
+
+    def get(self, id: UUID) -> Pet:
+        pets = self.get_many([id])
+        return pets[0] if pets else None
+
+    def get_many(self, ids: Iterable[UUID]) -> list[Pet]:
+        ids = list(ids)
+        stored = {pet.id: pet for pet in self._track(self.repository.get_many([id for id in ids if id not in self.new]))}
+        return [self.new.get(id) or stored[id] for id in ids if id in self.new or id in stored]
+
+    def list_page(self, after_id: UUID | None = None, limit: int = 100) -> list[Pet]:
+        return self._track(self.repository.list_page(after_id, limit))
+
+    def find_by_owner(self, owner_name: str) -> list[Pet]:
+        return self._track(self.repository.find_by_owner(owner_name))
+
+    def find_by_species(self, species: str) -> list[Pet]:
+        return self._track(self.repository.find_by_species(species))
+
+    def find_by_visit_date(self, date: datetime.date) -> list[Pet]:
+        return self._track(self.repository.find_by_visit_date(date))
+
+    def _track(self, pets: list[Pet]) -> list[Pet]:
+        for pet in pets:
+            if pet.id not in self.seen:
+                self.seen[pet.id] = pet
+                self.headers[pet.id] = header(pet)
+                pet.visit_listeners.append(self._on_visit_added)
+        return pets
+
+    def dirty(self) -> list[Pet]:
+        """Loaded pets whose header changed since they were loaded."""
+        return [
+            pet for id, pet in self.seen.items() if id not in self.new and header(pet) != self.headers[id]
+        ]
+
+    def list(self) -> list[Pet]:
+        return self._track(self.repository.list())
+
+    def _on_visit_added(self, pet: Pet, visit: Visit) -> None:
+        if pet.id not in self.new and pet.id not in self.appended:
+            self.appended[pet.id] = (pet, len(pet.visits) - 1)
+
+    def flush(self) -> None:
+        self.repository.save_changes(list(self.new.values()), list(self.appended.values()), self.dirty())
+        self.forget()
+
+    def discard(self) -> None:
+        # Loaded pets may be the stored objects themselves (in-memory backend): undo their new visits
+        for pet, start in self.appended.values():
+            del pet.visits[start:]
+        for pet in self.dirty():
+            pet.name, pet.species, pet.owner_name = self.headers[pet.id]
+        self.forget()
+
+    def forget(self) -> None:
+        for pet in self.seen.values():
+            pet.visit_listeners.remove(self._on_visit_added)
+        self.new.clear()
+        self.appended.clear()
+        self.seen.clear()
+        self.headers.clear()
+
+
+class AbstractUnitOfWork(ABC):
+    pets: AbstractPetRepository
+
+    def __enter__(self) -> "AbstractUnitOfWork":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.rollback()
+
+    @abstractmethod
+    def commit(self) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def rollback(self) -> None:
+        raise NotImplementedError
+
+
+class PetUnitOfWork(AbstractUnitOfWork):
+    """Collects new pets, appended visits and changed headers and writes them with one `save_changes`
+    call on commit."""
+
+    def __init__(self, repository: AbstractPetRepository) -> None:
+        self.pets = TrackingPetRepository(repository)
+
+    def commit(self) -> None:
+        self.pets.flush()
+
+    def rollback(self) -> None:
+        self.pets.discard()
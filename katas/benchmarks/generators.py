@@ -0,0 +1,42 @@
+"""Generadores deterministas de datos sintéticos para los benchmarks.
+
+Devuelven tuplas simples en lugar de objetos de dominio para que cada implementación construya
+sus propias clases a partir de los mismos datos.
+"""
+
+import datetime
+import random
+
+SPECIALTIES = ["canina", "felina", "exótica", "aves", "equina"]
+SPECIES = ["Dog", "Cat", "Parrot", "Horse", "Rabbit"]
+START = datetime.date(2025, 10, 18)
+
+
+def vets(n: int, seed: int = 0, max_daily=(4, 12)) -> list[tuple[str, str, int]]:
+    rng = random.Random(seed)
+    return [(f"Vet {i}", rng.choice(SPECIALTIES), rng.randint(*max_daily)) for i in range(n)]
+
+
+def appointment_requests(n: int, days: int = 5, seed: int = 1) -> list[tuple[str, str, str, datetime.date]]:
+    rng = random.Random(seed)
+    return [
+        (f"Cliente {i}", f"Mascota {i}", rng.choice(SPECIALTIES), START + datetime.timedelta(days=rng.randrange(days)))
+        for i in range(n)
+    ]
+
+
+def pets(n: int, owners: int = 1_000, visits_per_pet: int = 3, days: int = 90, seed: int = 2):
+    """Tuplas (nombre, especie, dueño, [(fecha, motivo, veterinario), ...])."""
+    rng = random.Random(seed)
+    return [
+        (
+            f"Pet {i}",
+            rng.choice(SPECIES),
+            f"Owner {rng.randrange(owners)}",
+            [
+                (START + datetime.timedelta(days=rng.randrange(days)), "Checkup", f"Vet {rng.randrange(50)}")
+                for _ in range(visits_per_pet)
+            ],
+        )
+        for i in range(n)
+    ]
@@ -0,0 +1,240 @@
+"""Suite de benchmarks de las katas de modelo de dominio (capítulo 1) y repositorio (capítulo 2).
+
+Uso:
+    python katas/benchmarks/run.py --vets 500 --requests 5000 --pets 20000 --output resultados.json
+    python katas/benchmarks/run.py --compare resultados.json   # compara contra una ejecución anterior
+
+Cada benchmark se repite `--repeat` veces con datos recién construidos y se guarda el mejor tiempo.
+El JSON resultante está pensado para guardarse por commit y compararse con `--compare`.
+"""
+
+import argparse
+import importlib
+import json
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BENCHMARKS = Path(__file__).resolve().parent
+KATAS = BENCHMARKS.parent
+CHAPTER_1 = KATAS / "Chapter_1_Domain_Model" / "solutions"
+CHAPTER_2 = KATAS / "Chapter_2_Repository_Pattern" / "solutions" / "saulin18"
+sys.path.insert(0, str(KATAS))
+
+import generators  # noqa: E402
+
+
+def load_solution(directory: Path, *names: str) -> list:
+    """Importa módulos de una solución con imports absolutos (`from exceptions import ...`).
+
+    Los módulos se retiran de `sys.modules` al terminar para que soluciones con nombres de
+    archivo repetidos (`solution.py`, `exceptions.py`) no se pisen entre sí.
+    """
+    before = set(sys.modules)
+    sys.path.insert(0, str(directory))
+    try:
+        modules = [importlib.import_module(name) for name in names]
+    finally:
+        sys.path.remove(str(directory))
+        for name in set(sys.modules) - before:
+            module_file = getattr(sys.modules[name], "__file__", None)
+            if module_file and Path(module_file).parent == directory:
+                del sys.modules[name]
+    return modules
+
+
+# Las soluciones no modelan igual la capacidad: los tiempos de asignación no son comparables entre sí
+ALLOCATION_NOTE = (
+    "markospy limita el máximo de citas por veterinario y día; dfiallo35 y saulin18 lo aplican a todo "
+    "el calendario, así que asignan menos solicitudes y hacen un trabajo distinto"
+)
+
+
+def allocation_cases(vet_specs, request_specs):
+    """Cada caso devuelve una función `setup` que construye objetos nuevos y devuelve lo que se cronometra."""
+    from Chapter_1_Domain_Model.solutions.markospy import models as markospy
+    from Chapter_1_Domain_Model.solutions.markospy.exceptions import NoAvailableVet
+
+    (dfiallo35,) = load_solution(CHAPTER_1 / "dfiallo35", "models")
+    (saulin18,) = load_solution(CHAPTER_1 / "saulin18", "solution")
+
+    def sequential(module, error=Exception):
+        def setup():
+            vets = [module.Veterinarian(*spec) for spec in vet_specs]
+            requests = [module.AppointmentRequest(*spec) for spec in request_specs]
+
+            def run():
+                allocated = 0
+                for request in requests:
+                    try:
+                        allocated += not isinstance(module.allocate_appointment(request, vets), error)
+                    except error:
+                        pass
+                return allocated
+
+            return run
+
+        return setup
+
+    def markospy_batch():
+        vets = [markospy.Veterinarian(*spec) for spec in vet_specs]
+        requests = [markospy.AppointmentRequest(*spec) for spec in request_specs]
+        return lambda: len(markospy.allocate_many(requests, vets).assignments)
+
+    return {
+        "allocation/markospy.allocate_appointment": sequential(markospy, NoAvailableVet),
+        "allocation/markospy.allocate_many": markospy_batch,
+        "allocation/dfiallo35.allocate_appointment": sequential(dfiallo35),
+        "allocation/saulin18.allocate_appointment": sequential(saulin18, saulin18.NoAvailableVet),
+    }
+
+
+def repository_cases(pet_specs):
+    solution, in_memory, sqlite, cached = load_solution(
+        CHAPTER_2, "solution", "in_memory_pet_repository", "sqlite_pet_repository", "cached_pet_repository"
+    )
+    def cached_view(warm: bool):
+        # El backend se llena directamente y se cronometra un CachedPetRepository nuevo (otra unidad de
+        # trabajo): llenarlo a través de la caché deja todas las mascotas en su identity map y solo se
+        # medirían búsquedas en un dict. "warm" precarga la caché compartida desde otra unidad de trabajo.
+        def view(backend, pets):
+            cache = cached.PetCache(max_size=max(len(pets), 1))
+            if warm:
+                cached.CachedPetRepository(backend, cache).get_many([pet.id for pet in pets])
+            return cached.CachedPetRepository(backend, cache)
+
+        return view
+
+    backends = {
+        "in_memory": (in_memory.InMemoryPetRepositoryImpl, None),
+        "sqlite": (sqlite.SqlitePetRepository, None),
+        "cached_sqlite_cold": (sqlite.SqlitePetRepository, cached_view(warm=False)),
+        "cached_sqlite_warm": (sqlite.SqlitePetRepository, cached_view(warm=True)),
+    }
+
+    def build_pets():
+        pets = []
+        for name, species, owner_name, visits in pet_specs:
+            pet = solution.Pet(name=name, species=species, owner_name=owner_name)
+            for date, reason, veterinarian_name in visits:
+                pet.add_visit(solution.Visit(date=date, reason=reason, veterinarian_name=veterinarian_name))
+            pets.append(pet)
+        return pets
+
+    def populated(factory, view):
+        pets = build_pets()
+        backend = factory()
+        backend.add_many(pets)
+        return (view(backend, pets) if view else backend), pets
+
+    cases = {}
+    for backend, (factory, view) in backends.items():
+
+        def add_many(factory=factory, view=view):
+            pets = build_pets()
+            repository = view(factory(), []) if view else factory()
+            return lambda: repository.add_many(pets) or len(pets)
+
+        def get_many(factory=factory, view=view):
+            repository, pets = populated(factory, view)
+            ids = [pet.id for pet in pets]
+            return lambda: len(repository.get_many(ids))
+
+        def iter_all(factory=factory, view=view):
+            repository, _ = populated(factory, view)
+            return lambda: sum(1 for _ in repository.iter_all(batch_size=1_000))
+
+        def find_by_owner(factory=factory, view=view):
+            repository, _ = populated(factory, view)
+            owners = [f"Owner {i}" for i in range(100)]
+            return lambda: sum(len(repository.find_by_owner(owner)) for owner in owners)
+
+        if not backend.endswith("_warm"):
+            # Con la caché precargada add_many mide lo mismo que en frío
+            cases[f"repository/{backend}.add_many"] = add_many
+        cases[f"repository/{backend}.get_many"] = get_many
+        cases[f"repository/{backend}.iter_all"] = iter_all
+        cases[f"repository/{backend}.find_by_owner"] = find_by_owner
+    return cases
+
+
+def measure(setup, repeat: int) -> tuple[float, object]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        run = setup()
+        start = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=KATAS, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline_path: str) -> None:
+    baseline = {row["benchmark"]: row for row in json.loads(Path(baseline_path).read_text())["results"]}
+    print(f"\n{'benchmark':50} {'antes (s)':>10} {'ahora (s)':>10} {'ratio':>7}")
+    for row in results["results"]:
+        previous = baseline.get(row["benchmark"])
+        if previous is None:
+            continue
+        ratio = row["seconds"] / previous["seconds"] if previous["seconds"] else float("inf")
+        print(f"{row['benchmark']:50} {previous['seconds']:10.4f} {row['seconds']:10.4f} {ratio:7.2f}")
+
+
+def main(argv=None) -> dict:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vets", type=int, default=500)
+    parser.add_argument("--requests", type=int, default=5_000)
+    parser.add_argument("--days", type=int, default=5)
+    parser.add_argument("--pets", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", help="ejecuta solo los benchmarks cuyo nombre contiene este texto")
+    parser.add_argument("--output", help="ruta del JSON de resultados")
+    parser.add_argument("--compare", help="JSON de una ejecución anterior para comparar")
+    args = parser.parse_args(argv)
+
+    cases = {
+        **allocation_cases(
+            generators.vets(args.vets, seed=args.seed),
+            generators.appointment_requests(args.requests, days=args.days, seed=args.seed + 1),
+        ),
+        **repository_cases(generators.pets(args.pets, seed=args.seed + 2)),
+    }
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "parameters": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+            "notes": {"allocation": ALLOCATION_NOTE},
+        },
+        "results": [],
+    }
+    for name, setup in cases.items():
+        if args.only and args.only not in name:
+            continue
+        seconds, result = measure(setup, args.repeat)
+        results["results"].append({"benchmark": name, "seconds": seconds, "result": result})
+        print(f"{name:50} {seconds:10.4f} s  (resultado: {result})")
+    if any(row["benchmark"].startswith("allocation/") for row in results["results"]):
+        print(f"\nNota: {ALLOCATION_NOTE}.")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    if args.compare:
+        compare(results, args.compare)
+    return results
+
+
+if __name__ == "__main__":
+    main()
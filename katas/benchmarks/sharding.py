@@ -0,0 +1,95 @@
+"""Escalado de `ShardedAllocator` con el número de procesos.
+
+Uso:
+    python katas/benchmarks/sharding.py --vets 2000 --requests 200000 --clinics 16 --workers 1 2 4 8
+
+Los veterinarios se reparten entre `--clinics` clínicas (un shard por clínica) y cada solicitud tiene
+una clínica de origen. Se cronometra solo `allocate_many`; arrancar los procesos queda fuera. El
+speedup se calcula frente a `models.allocate_many` en el propio proceso, y la eficiencia es speedup /
+procesos: cerca de 1 significa escalado lineal. "serie" es el tiempo de CPU del proceso padre
+(`parent_seconds`) como fracción de `allocate_many` en el proceso; "límite" es el speedup máximo que
+permite con infinitos núcleos (ley de Amdahl). Con menos núcleos que procesos no se puede escalar.
+"""
+
+import argparse
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+
+KATAS = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(KATAS))
+
+import generators  # noqa: E402
+from Chapter_1_Domain_Model.solutions.markospy.models import (  # noqa: E402
+    AppointmentRequest,
+    Veterinarian,
+    allocate_many,
+)
+from Chapter_1_Domain_Model.solutions.markospy.sharding import ShardedAllocator  # noqa: E402
+
+
+def in_process(vet_specs, request_specs, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        vets = [Veterinarian(*spec) for spec in vet_specs]
+        requests = [AppointmentRequest(*spec, id=index) for index, spec in enumerate(request_specs)]
+        start = time.perf_counter()
+        allocate_many(requests, vets)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(vet_specs, request_specs, clinics: int, workers: int, repeat: int) -> tuple[float, float, int]:
+    best, parent, allocated = float("inf"), 0.0, 0
+    for _ in range(repeat):
+        vets = [Veterinarian(*spec) for spec in vet_specs]
+        clinic_of = {vet.id: index % clinics for index, vet in enumerate(vets)}
+        requests = [AppointmentRequest(*spec, id=index) for index, spec in enumerate(request_specs)]
+        with ShardedAllocator(
+            vets,
+            workers=workers,
+            partition=lambda vet: clinic_of[vet.id],
+            route=lambda request: request.id % clinics,
+        ) as allocator:
+            start = time.perf_counter()
+            result = allocator.allocate_many(requests)
+            seconds = time.perf_counter() - start
+            if seconds < best:
+                best, parent = seconds, allocator.parent_seconds
+        allocated = len(result.assignments)
+    return best, parent, allocated
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--vets", type=int, default=2_000)
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--clinics", type=int, default=16)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    vet_specs = generators.vets(args.vets, seed=args.seed)
+    request_specs = generators.appointment_requests(args.requests, days=args.days, seed=args.seed + 1)
+    print(f"CPUs: {multiprocessing.cpu_count()}")
+    baseline = in_process(vet_specs, request_specs, args.repeat)
+    print(f"allocate_many en el proceso: {baseline:.4f} s")
+    print(
+        f"{'procesos':>8} {'segundos':>10} {'asignadas':>10} {'speedup':>8} {'eficiencia':>10}"
+        f" {'serie':>6} {'límite':>7}"
+    )
+    for workers in args.workers:
+        seconds, parent, allocated = run(vet_specs, request_specs, args.clinics, workers, args.repeat)
+        speedup = baseline / seconds
+        serial = parent / baseline
+        print(
+            f"{workers:8} {seconds:10.4f} {allocated:10} {speedup:8.2f} {speedup / workers:10.2f}"
+            f" {serial:6.2f} {1 / serial:7.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
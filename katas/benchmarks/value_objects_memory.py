@@ -0,0 +1,93 @@
+"""Memoria y tiempo de carga de objetos de valor: antes (objetos con __dict__ y uuid4) y después (slots).
+
+Uso: python katas/benchmarks/value_objects_memory.py [N]
+
+Los resultados se expresan siempre por cada 1M de objetos, aunque se mida con un N menor.
+"""
+
+import datetime
+import itertools
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from uuid import uuid4
+
+KATAS = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(KATAS))
+sys.path.insert(0, str(KATAS / "Chapter_2_Repository_Pattern" / "solutions" / "saulin18"))
+
+from Chapter_1_Domain_Model.solutions.markospy.models import AppointmentRequest  # noqa: E402
+from solution import Visit, VisitHistory, monotonic_ids  # noqa: E402
+
+
+class LegacyAppointmentRequest:
+    def __init__(self, client_name, pet_name, specialty, date):
+        self.id = uuid4()
+        self.client_name = client_name
+        self.pet_name = pet_name
+        self.specialty = specialty
+        self.date = date
+
+
+class LegacyVisit:
+    def __init__(self, id=None, date=None, reason="", veterinarian_name=""):
+        self.id = id if id else uuid4()
+        self.date = date
+        self.reason = reason
+        self.veterinarian_name = veterinarian_name
+
+
+def measure(build, n):
+    # El tiempo se mide sin tracemalloc, que ralentiza cada asignación
+    start = time.perf_counter()
+    objects = build(n)
+    elapsed = time.perf_counter() - start
+    del objects
+    tracemalloc.start()
+    objects = build(n)
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+    scale = 1_000_000 / n
+    return memory * scale / 2**20, elapsed * scale
+
+
+def main(n):
+    day = datetime.date(2025, 10, 18)
+    ids = itertools.count()
+    visit_ids = monotonic_ids()
+
+    def visit_history(n):
+        history = VisitHistory()
+        for _ in range(n):
+            history.append(day, "Chequeo", "Dra. López")
+        return history
+
+    cases = {
+        "AppointmentRequest (antes)": lambda n: [
+            LegacyAppointmentRequest("Marcos", "Roco", "canina", day) for _ in range(n)
+        ],
+        "AppointmentRequest (slots, uuid4)": lambda n: [
+            AppointmentRequest("Marcos", "Roco", "canina", day) for _ in range(n)
+        ],
+        "AppointmentRequest (slots, id secuencial)": lambda n: [
+            AppointmentRequest("Marcos", "Roco", "canina", day, next(ids)) for _ in range(n)
+        ],
+        "Visit (antes)": lambda n: [LegacyVisit(None, day, "Chequeo", "Dra. López") for _ in range(n)],
+        "Visit (slots, uuid4)": lambda n: [
+            Visit(date=day, reason="Chequeo", veterinarian_name="Dra. López") for _ in range(n)
+        ],
+        "Visit (slots, monotonic_ids)": lambda n: [
+            Visit(visit_ids(), day, "Chequeo", "Dra. López") for _ in range(n)
+        ],
+        "VisitHistory (columnar)": visit_history,
+    }
+    print(f"{'caso':45} {'MiB / 1M':>10} {'s / 1M':>8}")
+    for name, build in cases.items():
+        memory, elapsed = measure(build, n)
+        print(f"{name:45} {memory:10.1f} {elapsed:8.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)